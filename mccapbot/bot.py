@@ -5,17 +5,20 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional, Dict, Any, List  # NEW: Any, List
 import datetime as dt                        # NEW: for window math
+from urllib.parse import quote
 
-from .config import DONATION_WALLET, BALANCE_POLL_SECONDS
+from .config import DONATION_WALLET, BALANCE_POLL_SECONDS, PAY_EXPIRY_SEC, LOG_LEVEL, DEX_BLACKLIST
 from .logging_setup import log
-from .helpers import parse_mc_input, humanize
-from .helpers import username_from_id
-from .storage import load_reminders, load_invoices, load_alerts, reminders, invoices, alert_events, save_reminders, save_invoices
-from .solana import get_solana_balance
+from .helpers import parse_mc_input, humanize, to_lamports
+from .helpers import usernames_from_ids
+from .storage import load_reminders, load_invoices, load_alerts, reminders_by_guild, add_reminder, remove_reminder, invoices, alert_events, save_reminders, save_invoices, add_invoice
+from .solana import get_solana_balance, _random_pubkey
+from .solana import close_session as close_sol_session
 from .alerts import watcher as alerts_watcher
 from .payments import payments_watcher, solana_pay_link, qr_url, parse_asset_choice, new_invoice_id
 from .tables import fixed_table, payments_table_with_users, alerts_table
-from .cache import token_cache, TOKEN_CACHE_LOCK, update_cache
+from .cache import token_cache, update_cache
+from .dex import close_session as close_dex_session
 from .dex import fetch_dex_token, choose_consensus_pair, resolve_mc_value, build_token_url, get_image_url, table_lp, summarize_lp_venues
 from .models import Reminder, Invoice
 from .graduated import GraduatedCog
@@ -45,6 +48,11 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
                 import logging; logging.exception("Failed to update presence")
             await asyncio.sleep(BALANCE_POLL_SECONDS)
 
+    async def close(self):
+        await close_dex_session()
+        await close_sol_session()
+        await super().close()
+
     async def setup_hook(self):
         # load storage
         await load_reminders(); await load_invoices(); await load_alerts()
@@ -119,7 +127,7 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             url = build_token_url(ca, best)
             img = get_image_url(best, ca)
 
-            await update_cache(
+            update_cache(
                 ca, mc=mc_now_val, url=url, source=src, dex=best.get("dexId",""),
                 chain=best.get("chainId",""), quote=((best.get("quoteToken") or {}).get("symbol") or "").upper(),
                 consensus=consensus, image_url=img
@@ -134,7 +142,7 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             if note:
                 msg += f"\n📝 Note saved."
 
-            reminders.append(Reminder(
+            add_reminder(Reminder(
                 ca=ca, target_mc=float(target_val), direction=direction,
                 channel_id=inter.channel_id, creator_id=inter.user.id,
                 guild_id=inter.guild_id or 0, name=name, symbol=symbol, note=(note or "").strip()
@@ -155,7 +163,7 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             await inter.response.defer(thinking=True, ephemeral=not public)
 
             gid = inter.guild_id or 0
-            sr = [r for r in reminders if r.guild_id == gid]
+            sr = list(reminders_by_guild.get(gid, ()))  # snapshot: the live bucket can change across the awaits below
 
             # Filter by user if provided
             if user:
@@ -169,8 +177,10 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
                 return
 
             # Snapshot current token cache
-            async with TOKEN_CACHE_LOCK:
-                snap_by_ca = {r.ca: token_cache.get(r.ca) for r in sr}
+            snap_by_ca = {r.ca: token_cache.get(r.ca) for r in sr}
+
+            uids = {r.creator_id for r in sr}
+            name_by_id = await usernames_from_ids(self, uids)
 
             headers = ["#", "Token", "Target", "Current", "By"]
             rows_ge, rows_le = [], []
@@ -178,18 +188,15 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             for i, r in enumerate(sr, 1):
                 s = snap_by_ca.get(r.ca)
                 curr = f"${humanize(s.mc)}" if s and s.mc is not None else "—"
-                dir_sym = "≥" if r.direction == "above" else "≤"
-                label = r.symbol or r.name
                 row = [
                     str(i),
-                    label,
-                    f"{dir_sym} ${humanize(r.target_mc)}",
+                    r._fmt_label,
+                    r._fmt_target,
                     curr,
-                    await username_from_id(self, r.creator_id)
+                    name_by_id[r.creator_id]
                 ]
                 (rows_ge if r.direction == "above" else rows_le).append(row)
 
-            from .tables import fixed_table
             filt = f" (filtered by {user.display_name})" if user else ""
             embed = discord.Embed(
                 title="Market Cap Alerts",
@@ -200,13 +207,13 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             if rows_ge:
                 embed.add_field(
                     name="📈 Breakouts (MC ≥ target)",
-                    value=fixed_table(headers, rows_ge),
+                    value=await asyncio.to_thread(fixed_table, headers, rows_ge),
                     inline=False
                 )
             if rows_le:
                 embed.add_field(
                     name="📉 Pullbacks (MC ≤ target)",
-                    value=fixed_table(headers, rows_le),
+                    value=await asyncio.to_thread(fixed_table, headers, rows_le),
                     inline=False
                 )
 
@@ -219,14 +226,14 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
         async def mc_remove(inter: discord.Interaction, index: int):
             await inter.response.defer(thinking=False)
             gid = inter.guild_id or 0
-            sr = [r for r in reminders if r.guild_id == gid]
+            sr = list(reminders_by_guild.get(gid, ()))  # snapshot of the live bucket
             if index < 1 or index > len(sr):
                 await inter.followup.send("❌ Invalid index. Use `/mc_list` to see valid indices."); return
             rem = sr[index-1]
             can_manage = isinstance(inter.user, discord.Member) and inter.user.guild_permissions.manage_guild
             if inter.user.id != rem.creator_id and not can_manage:
                 await inter.followup.send("❌ Only the alert creator or a user with **Manage Server** can remove this alert."); return
-            reminders.remove(rem); await save_reminders()
+            remove_reminder(rem); await save_reminders()
             await inter.followup.send(f"🗑️ Removed alert #{index} for **{rem.name} ({rem.symbol})** (MC {'≥' if rem.direction=='above' else '≤'} ${humanize(rem.target_mc)}).")
 
         # ------- Recent fired alerts -------
@@ -235,21 +242,19 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
         async def mc_recent(inter: discord.Interaction, count: Optional[int] = 5, user: Optional[discord.User] = None, public: Optional[bool] = True):
             await inter.response.defer(thinking=True, ephemeral=not public)
             gid = inter.guild_id or 0
-            evs = [e for e in alert_events if e.guild_id == gid]
-            if user:
-                evs = [e for e in evs if e.creator_id == user.id]
+            uid = user.id if user else None
+            evs = [e for e in alert_events if e.guild_id == gid and (uid is None or e.creator_id == uid)]
             evs.sort(key=lambda e: e.ts, reverse=True)
             n = max(1, min(int(count or 5), 50)); evs = evs[:n]
             if not evs:
                 await inter.followup.send("No matching alerts found.", ephemeral=not public); return
 
             uids = {e.creator_id for e in evs}
-            name_by_id = {uid: await username_from_id(self, uid) for uid in uids}
+            name_by_id = await usernames_from_ids(self, uids)
 
-            async with TOKEN_CACHE_LOCK:
-                current_by_ca = {e.ca: (token_cache.get(e.ca).mc if token_cache.get(e.ca) else None) for e in evs}
+            current_by_ca = {e.ca: (token_cache.get(e.ca).mc if token_cache.get(e.ca) else None) for e in evs}
 
-            table = alerts_table(evs, name_by_id, current_by_ca)
+            table = await asyncio.to_thread(alerts_table, evs, name_by_id, current_by_ca)
             filt = f" — by: {user.name}" if user else ""
             embed = discord.Embed(title="Recent Alerts", description=f"Most recent {len(evs)} alert(s){filt}", color=0xf39c12)
             embed.add_field(name="History", value=table, inline=False)
@@ -266,28 +271,27 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
             if amount <= 0: await inter.followup.send("Enter a positive amount.", ephemeral=True); return
 
             asset_u, dec, mint = parse_asset_choice(asset_value)
-            ref_full = __import__("mccapbot.solana", fromlist=['_random_pubkey'])._random_pubkey()
+            ref_full = _random_pubkey()
             if asset_u == "SOL":
-                amount_base = __import__("mccapbot.helpers", fromlist=['to_lamports']).to_lamports(amount)
+                amount_base = to_lamports(amount)
                 sp_link = solana_pay_link(DONATION_WALLET, amount, label="McCap Bot", message=(note or ""), reference=ref_full)
             else:
                 amount_base = int(round(amount * (10**dec)))
                 sp_link = solana_pay_link(DONATION_WALLET, amount, label="McCap Bot", message=(note or ""), reference=ref_full, spl_token=mint)
 
-            inv = Invoice(id=ref_full[:6], reference=ref_full, asset=asset_u, mint=(mint or ""), amount_base=amount_base, decimals=dec,
+            inv = Invoice(id=new_invoice_id(), reference=ref_full, asset=asset_u, mint=(mint or ""), amount_base=amount_base, decimals=dec,
                           user_id=inter.user.id, channel_id=inter.channel_id, guild_id=inter.guild_id or 0,
                           note=(note or ""), created_ts=time.time())
-            invoices.append(inv); await save_invoices()
+            add_invoice(inv); await save_invoices()
 
-            from urllib.parse import quote
             encoded = quote(sp_link, safe="")
             phantom_ul  = f"https://phantom.app/ul/v1/pay?link={encoded}"
             solflare_ul = f"https://solflare.com/ul/v1/solanaPay?link={encoded}"
-            qr = __import__("mccapbot.payments", fromlist=['qr_url']).qr_url(sp_link, 260)
+            qr = qr_url(sp_link, 260)
 
             desc=(f"**Phantom (browser extension):** click the button below — the extension will open.\n"
                   f"Or scan the **QR**, or use Solflare.\n\n**Amount:** {amount:,.4f} {asset_u}\n"
-                  f"**Invoice ID:** `{inv.id}` (expires in {__import__('mccapbot.config', fromlist=['PAY_EXPIRY_SEC']).PAY_EXPIRY_SEC//60}m)\n\n"
+                  f"**Invoice ID:** `{inv.id}` (expires in {PAY_EXPIRY_SEC//60}m)\n\n"
                   f"**Mobile users:** you can also tap this Solana Pay link:\n`{sp_link}`")
             embed=discord.Embed(title="Solana Pay", description=desc, color=0x00b894); embed.set_image(url=qr)
             view=discord.ui.View()
@@ -328,15 +332,16 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
                 member_ok = isinstance(inter.user, discord.Member) and (inter.user.guild_permissions.manage_guild or inter.user.guild_permissions.administrator)
                 if not member_ok:
                     await inter.followup.send("❌ You need **Manage Server** to view server-wide payments.", ephemeral=not public); return
-            records = [i for i in invoices if i.guild_id == gid]
-            if scope_val == "mine": records = [i for i in records if i.user_id == inter.user.id]
-            if status: records = [i for i in records if i.status == status.value]
+            uid = inter.user.id if scope_val == "mine" else None
+            want = status.value if status else None
+            records = [i for i in invoices
+                       if i.guild_id == gid and (uid is None or i.user_id == uid) and (want is None or i.status == want)]
             records.sort(key=lambda x: x.created_ts, reverse=True)
             records = records[: (limit or 15)]
             if not records: await inter.followup.send("No matching payments found.", ephemeral=not public); return
             unique_uids = {i.user_id for i in records}
-            name_by_id: Dict[int,str] = {uid: await username_from_id(self, uid) for uid in unique_uids}
-            table = payments_table_with_users(records, name_by_id)
+            name_by_id: Dict[int,str] = await usernames_from_ids(self, unique_uids)
+            table = await asyncio.to_thread(payments_table_with_users, records, name_by_id)
             scope_label = "your payments" if scope_val == "mine" else "server payments"
             filt = f" — status:{status.value}" if status else ""
             embed = discord.Embed(title="Payments", description=f"{scope_label}{filt}", color=0x00b894)
@@ -359,7 +364,6 @@ class Bot(commands.Bot):  # ✅ inherit from commands.Bot so add_cog/tree work
         except Exception as e:
             print(f"⚠️ Slash sync failed: {e}")
         guilds = ", ".join([f"{g.name}({g.id})" for g in self.guilds]) or "none"
-        from .config import LOG_LEVEL, DEX_BLACKLIST
         log.info(f"Logged in as {self.user} | Guilds: [{guilds}] | LOG_LEVEL={LOG_LEVEL} | DEX_BLACKLIST={sorted(DEX_BLACKLIST)}")
 
     async def on_guild_join(self, guild: discord.Guild):
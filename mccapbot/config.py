@@ -12,10 +12,13 @@ LOG_LEVEL         = os.getenv("LOG_LEVEL", "INFO").upper()
 
 BALANCE_POLL_SECONDS = int(os.getenv("BALANCE_POLL_SECONDS", "300"))
 POLL_SECONDS          = 3
+COLD_POLL_SECONDS     = int(os.getenv("COLD_POLL_SECONDS", "30"))  # refresh interval for tokens far from any target
+HOT_BAND              = 0.10                                      # within 10% of a target -> refresh every POLL_SECONDS
 
 DEX_TOKEN_URL     = "https://api.dexscreener.com/latest/dex/tokens/{address}"
 SOLANA_USE_FDV    = True
-DEX_BLACKLIST     = {"heaven"}
+DEX_BLACKLIST     = frozenset({"heaven"})
+DEX_BLACKLIST_LOWER = frozenset(x.lower() for x in DEX_BLACKLIST)
 
 USDC_MINT         = os.getenv("USDC_MINT", "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v")
 PAY_EXPIRY_SEC    = int(os.getenv("PAY_EXPIRY_SEC", "1800"))
@@ -24,6 +27,7 @@ PAY_POLL_SEC      = int(os.getenv("PAY_POLL_SEC", "10"))
 # ---- Files ----
 REM_FILE    = "reminders.json"
 PAY_FILE    = "payments.json"
+PAY_CURSOR_FILE = "payments_cursor.json"  # last processed signature per donation wallet
 ALERTS_FILE = "alerts.json"
 
 # ---- Display helpers ----
@@ -7,6 +7,7 @@ DEX_ALIASES = {
     "pumpswap": "pumpswap",
     "pump.fun": "pumpswap",
 }
-LP_VENUES = ["meteora", "raydium", "pumpswap"]
+LP_VENUES = ("meteora", "raydium", "pumpswap")  # display order
+LP_VENUE_SET = frozenset(LP_VENUES)
 BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
 LAMPORTS = 1_000_000_000
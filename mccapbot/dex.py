@@ -1,98 +1,218 @@
-import math, aiohttp
+import asyncio, heapq, math, time, aiohttp
+import orjson
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
-from .config import DEX_TOKEN_URL, SOLANA_USE_FDV, DEX_BLACKLIST
+from .config import DEX_TOKEN_URL, SOLANA_USE_FDV, DEX_BLACKLIST_LOWER
 from .helpers import is_solana_address
-from .constants import LP_VENUES
-from .helpers import humanize, _percentile, _median
+from .constants import DEX_ALIASES, LP_VENUES, LP_VENUE_SET
+from .helpers import humanize, _median
 
-async def fetch_dex_token(address: str):
-    url = DEX_TOKEN_URL.format(address=address.strip())
+_EMPTY: Dict = {}  # shared read-only fallback for missing sub-objects; never mutate
+
+# Shared HTTP session (keep-alive + DNS cache); created lazily on the running loop.
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=12),
+        )
+    return _session
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed: await _session.close()
+    _session = None
+
+# In-flight fetches keyed by address; concurrent callers share one request.
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Recent successful payloads: address -> (monotonic fetch time, data), oldest first.
+_RESULT_TTL = 10.0
+_RESULT_MAX = 4096
+_results: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+async def fetch_dex_token(address: str, *, max_age: float = _RESULT_TTL):
+    address = address.strip()
+    hit = _results.get(address)
+    if hit is not None and time.monotonic() - hit[0] < max_age: return hit[1]
+    task = _inflight.get(address)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_dex_token(address))
+        _inflight[address] = task
+        task.add_done_callback(lambda _t: _inflight.pop(address, None))
+    return await asyncio.shield(task)
+
+async def _fetch_dex_token(address: str):
+    data = await _enqueue(address)
+    if data is not None:
+        _results.pop(address, None); _results[address] = (time.monotonic(), data)
+        if len(_results) > _RESULT_MAX: _results.popitem(last=False)
+    return data
+
+# Lookups are coalesced: addresses queued within _BATCH_WINDOW (or until _BATCH_MAX
+# are queued) go out as one comma-separated /tokens request.
+_BATCH_MAX = 30
+_BATCH_WINDOW = 0.05
+_queued: Dict[str, asyncio.Future] = {}
+_flush_handle: Optional[asyncio.TimerHandle] = None
+_flushing: set = set()
+_HTTP_SEM = asyncio.Semaphore(8)  # caps concurrent Dex HTTP requests across all callers
+
+def _enqueue(address: str) -> asyncio.Future:
+    global _flush_handle
+    fut = _queued.get(address)
+    if fut is None:
+        loop = asyncio.get_running_loop()
+        fut = _queued[address] = loop.create_future()
+        if len(_queued) >= _BATCH_MAX: _flush()
+        elif _flush_handle is None: _flush_handle = loop.call_later(_BATCH_WINDOW, _flush)
+    return fut
+
+def _flush() -> None:
+    global _queued, _flush_handle
+    if _flush_handle is not None: _flush_handle.cancel(); _flush_handle = None
+    batch, _queued = _queued, {}
+    if not batch: return
+    task = asyncio.ensure_future(_resolve_batch(batch))
+    _flushing.add(task); task.add_done_callback(_flushing.discard)
+
+async def _resolve_batch(batch: Dict[str, asyncio.Future]) -> None:
+    try: results = await fetch_dex_tokens(list(batch))
+    except Exception: results = {}
+    for address, fut in batch.items():
+        if not fut.done(): fut.set_result(results.get(address))
+
+async def fetch_dex_tokens(addresses: List[str]) -> Dict[str, Optional[Dict]]:
+    """Fetch many tokens in chunks of _BATCH_MAX; maps each address to a {"pairs": [...]} payload (None on failure)."""
+    chunks = [addresses[i:i+_BATCH_MAX] for i in range(0, len(addresses), _BATCH_MAX)]
+    out: Dict[str, Optional[Dict]] = {}
+    for part in await asyncio.gather(*(_fetch_chunk(c) for c in chunks)): out.update(part)
+    return out
+
+async def _fetch_chunk(addresses: List[str]) -> Dict[str, Optional[Dict]]:
+    url = DEX_TOKEN_URL.format(address=",".join(addresses))
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=12)) as s:
-            async with s.get(url) as r:
-                if r.status != 200:
-                    return None
-                return await r.json()
+        async with _HTTP_SEM, get_session().get(url) as r:
+            if r.status != 200:
+                return dict.fromkeys(addresses)
+            data = orjson.loads(await r.read())
     except Exception:
-        return None
+        return dict.fromkeys(addresses)
+    # The combined response lists every pair for every address; split it back per token.
+    by_addr: Dict[str, List[Dict]] = {a.lower(): [] for a in addresses}
+    for p in (data or _EMPTY).get("pairs") or []:
+        seen = set()
+        for side in ("baseToken", "quoteToken"):
+            key = ((p.get(side) or _EMPTY).get("address") or "").lower()
+            if key in by_addr and key not in seen: by_addr[key].append(p); seen.add(key)
+    return {a: {"pairs": by_addr[a.lower()]} for a in addresses}
 
-def resolve_mc_value(pair: Dict, ca: str) -> Tuple[Optional[float], str]:
-    is_sol = (pair.get("chainId") == "solana") or is_solana_address(ca)
+def _to_pos_float(v) -> Optional[float]:
+    """float(v) if it parses and is > 0, else None; numeric types skip the try/except."""
+    if isinstance(v, (int, float)):
+        f = float(v); return f if f > 0 else None
+    if isinstance(v, str):
+        try: f = float(v)
+        except ValueError: return None
+        return f if f > 0 else None
+    return None
+
+def resolve_mc_value(pair: Dict, ca: str, *, ca_is_sol: Optional[bool] = None) -> Tuple[Optional[float], str]:
+    if ca_is_sol is None: ca_is_sol = is_solana_address(ca)
+    is_sol = ca_is_sol or (pair.get("chainId") == "solana")
     first, second = ("fdv","marketCap") if (SOLANA_USE_FDV and is_sol) else ("marketCap","fdv")
     for key in (first, second):
-        val = pair.get(key)
-        if val is not None:
-            try:
-                f = float(val)
-                if f > 0: return f, key
-            except: pass
-    try:
-        price = float(pair.get("priceUsd") or 0)
-        supply = float((pair.get("baseToken") or {}).get("circulatingSupply") or 0)
-        if price>0 and supply>0: return price*supply, "computed"
-    except: pass
+        f = _to_pos_float(pair.get(key))
+        if f is not None: return f, key
+    price = _to_pos_float(pair.get("priceUsd"))
+    supply = _to_pos_float((pair.get("baseToken") or _EMPTY).get("circulatingSupply"))
+    if price is not None and supply is not None: return price*supply, "computed"
     return None, "none"
 
-def _not_blacklisted(p: Dict) -> bool:
-    return ((p.get("dexId") or "").lower() not in DEX_BLACKLIST)
+def _token_pairs(pairs: List[Dict], ca: str, is_sol: bool):
+    """Single pass over `pairs`: yields (pair, lowered dexId) for pairs whose base token is `ca` on a non-blacklisted DEX."""
+    cal = None if is_sol else ca.lower()
+    for p in pairs:
+        addr = (p.get("baseToken") or _EMPTY).get("address") or ""
+        if is_sol:
+            if p.get("chainId") != "solana" or addr != ca: continue
+        elif addr.lower() != cal: continue
+        dex = (p.get("dexId") or "").lower()
+        if dex in DEX_BLACKLIST_LOWER: continue
+        yield p, dex
 
 def get_image_url(pair: Dict, ca: str) -> Optional[str]:
-    img = ((pair.get("info") or {}).get("imageUrl") or (pair.get("baseToken") or {}).get("logoURI"))
+    img = ((pair.get("info") or _EMPTY).get("imageUrl") or (pair.get("baseToken") or _EMPTY).get("logoURI"))
     if img and isinstance(img, str) and img.startswith("http"): return img
+    return _robohash(ca)
+
+@lru_cache(maxsize=2048)
+def _robohash(ca: str) -> str:
     return f"https://robohash.org/{ca}.png?size=200x200&set=set1"
 
 def _liq_vol_tx(p: Dict) -> Tuple[float,float,int]:
-    liq=float((p.get("liquidity") or {}).get("usd") or 0.0)
-    vol=float((p.get("volume") or {}).get("h24") or 0.0)
-    tx=(p.get("txns") or {}).get("h24") or {}
+    liq=float((p.get("liquidity") or _EMPTY).get("usd") or 0.0)
+    vol=float((p.get("volume") or _EMPTY).get("h24") or 0.0)
+    tx=(p.get("txns") or _EMPTY).get("h24") or _EMPTY
     txc=int(tx.get("buys") or 0)+int(tx.get("sells") or 0)
     return liq,vol,txc
 
+_INV_LN10 = 1.0/math.log(10.0)
+
 def _lp_score(liq: float, vol: float, tx: int) -> float:
-    return (math.log10(1+liq)*0.5) + (math.log10(1+vol)*0.4) + (math.log10(1+tx)*0.2)
+    # log10(1+x) == log1p(x)/ln(10)
+    return (math.log1p(liq)*0.5 + math.log1p(vol)*0.4 + math.log1p(tx)*0.2) * _INV_LN10
 
-def _dex_alias(p: Dict) -> str:
-    from .constants import DEX_ALIASES
-    return DEX_ALIASES.get((p.get("dexId") or "").lower(), (p.get("dexId") or "").lower())
+def _dex_alias(dex: str) -> str:
+    return DEX_ALIASES.get(dex, dex)
 
-def choose_consensus_pair(pairs: List[Dict], ca: str):
-    if not pairs: return None, 0.0, []
-    if is_solana_address(ca):
-        filtered=[p for p in pairs if p.get("chainId")=="solana" and ((p.get("baseToken") or {}).get("address")==ca)]
-    else:
-        cal=ca.lower()
-        filtered=[p for p in pairs if ((p.get("baseToken") or {}).get("address","").lower()==cal)]
-    filtered=[p for p in filtered if _not_blacklisted(p)]
-    if not filtered: return None, 0.0, []
+def _log10_percentile(sorted_vals: List[float], p: float) -> float:
+    """_percentile over log10(sorted_vals), taking logs of the two neighbouring points only."""
+    k=(len(sorted_vals)-1)*p; f=math.floor(k); c=math.ceil(k)
+    lf=math.log10(sorted_vals[f])
+    if f==c: return lf
+    return lf + (math.log10(sorted_vals[c])-lf)*(k-f)
 
+def choose_consensus_pair(pairs: List[Dict], ca: str):
+    is_sol=is_solana_address(ca)
     cands=[]; valid=[]
-    for p in filtered:
-        mc,src=resolve_mc_value(p, ca)
+    for p, _dex in _token_pairs(pairs, ca, is_sol):
+        mc,_src=resolve_mc_value(p, ca, ca_is_sol=is_sol)
         liq,vol,_tx=_liq_vol_tx(p)
         if mc and mc>0:
             valid.append(mc)
-            cands.append((p,mc,liq,vol,src))
+            cands.append((p,mc,liq,vol))
         else:
-            cands.append((p,float("nan"),liq,vol,"none"))
+            cands.append((p,float("nan"),liq,vol))
 
+    if not cands: return None, 0.0, []
     if not valid: return None, 0.0, cands
+    if len(cands)==1: return cands[0][0], cands[0][1], cands  # lone priced pair is its own consensus
 
-    logs=sorted([math.log10(v) for v in valid if v>0])
-    if len(logs)>=3:
-        q1=_percentile(logs,0.25); q3=_percentile(logs,0.75); iqr=q3-q1
-        lo=q1-1.5*iqr; hi=q3+1.5*iqr
-        kept=[10**x for x in logs if lo<=x<=hi]
-        base_vals=kept if len(kept)>=2 else valid
+    vals=sorted(valid)
+    if len(vals)>=3:
+        q1=_log10_percentile(vals,0.25); q3=_log10_percentile(vals,0.75); iqr=q3-q1
+        # IQR fence in log space, mapped back to linear so the sorted values can be sliced
+        lo=10**(q1-1.5*iqr); hi=10**(q3+1.5*iqr)
+        kept=vals[bisect_left(vals,lo):bisect_right(vals,hi)]
+        base_vals=kept if len(kept)>=2 else vals
     else:
-        base_vals=valid
-    consensus=_median(base_vals)
-
-    best=None; best_key=None
-    for p,mc,liq,vol,_src in cands:
-        if mc is None or math.isnan(mc): continue
-        rel=abs(mc-consensus)/consensus if consensus>0 else abs(mc-consensus)
-        key=(rel,-liq,-vol)
-        if best is None or key<best_key: best,best_key=p,key
+        base_vals=vals
+    consensus=_median(base_vals)  # base_vals is a slice of the sorted vals
+
+    # min over (rel, -liq, -vol) without building a key tuple per candidate
+    inv_c=1.0/consensus if consensus>0 else 1.0
+    best=None; b_rel=b_liq=b_vol=0.0
+    for p,mc,liq,vol in cands:
+        if mc is None or mc!=mc: continue  # mc!=mc: NaN
+        rel=abs(mc-consensus)*inv_c
+        if (best is None or rel<b_rel or (rel==b_rel and (liq>b_liq or (liq==b_liq and vol>b_vol)))):
+            best=p; b_rel=rel; b_liq=liq; b_vol=vol
     return best, consensus, cands
 
 def build_token_url(ca: str, pair: Optional[Dict]) -> str:
@@ -101,42 +221,41 @@ def build_token_url(ca: str, pair: Optional[Dict]) -> str:
     return "https://dexscreener.com"
 
 def summarize_lp_venues(pairs: List[Dict], ca: str):
-    if is_solana_address(ca):
-        flt=[p for p in pairs if p.get("chainId")=="solana" and ((p.get("baseToken") or {}).get("address")==ca)]
-    else:
-        cal=ca.lower(); flt=[p for p in pairs if ((p.get("baseToken") or {}).get("address","").lower()==cal)]
-    flt=[p for p in flt if _not_blacklisted(p)]
-    if not flt: return {}, None
-
+    is_sol=is_solana_address(ca)
     agg={}
-    for p in flt:
-        venue=_dex_alias(p)
-        if venue not in LP_VENUES: continue
+    for p, dex in _token_pairs(pairs, ca, is_sol):
+        venue=_dex_alias(dex)
+        if venue not in LP_VENUE_SET: continue
         liq,vol,txc=_liq_vol_tx(p)
-        quote=((p.get("quoteToken") or {}).get("symbol") or "").upper()
+        quote=((p.get("quoteToken") or _EMPTY).get("symbol") or "").upper()
         url=p.get("url") or build_token_url(ca,p)
-        a=agg.setdefault(venue, dict(pools=0, liq=0.0, vol=0.0, tx=0, quotes={}, best_url=url, best_liq=0.0))
+        a=agg.get(venue)
+        if a is None: a=agg[venue]={"pools":0, "liq":0.0, "vol":0.0, "tx":0, "quotes":{}, "best_url":url, "best_liq":0.0}
         a["pools"]+=1; a["liq"]+=liq; a["vol"]+=vol; a["tx"]+=txc
         if quote: a["quotes"][quote]=a["quotes"].get(quote,0)+1
         if liq>a["best_liq"]: a["best_liq"]=liq; a["best_url"]=url
     for v,a in agg.items(): a["score"]=_lp_score(a["liq"],a["vol"],a["tx"])
-    ranked=sorted(agg.items(), key=lambda kv:(-(kv[1]["score"]), -(kv[1]["liq"]), -(kv[1]["vol"])))
-    best=ranked[0] if ranked else None
+    if len(agg)<=1: best=next(iter(agg.items()), None)
+    else: best=min(agg.items(), key=lambda kv:(-(kv[1]["score"]), -(kv[1]["liq"]), -(kv[1]["vol"])))
     return agg, best
 
+_LP_HEADERS=["Venue","Pools","Liq","Vol24","Tx24","Quotes","Score"]; _LP_WIDTHS=[9,5,12,12,8,10,6]; _LP_ALIGNS=["l","r","r","r","r","l","r"]
+
+def _cut(s: str, w: int) -> str:
+    return s if len(s)<=w else s[:max(1,w-1)]+"…"
+
+# Fixed-width templates built once from the column spec above.
+_LP_ROW_FMT="  ".join(f"{{{i}:{'>' if a=='r' else '<'}{w}}}" for i,(w,a) in enumerate(zip(_LP_WIDTHS,_LP_ALIGNS)))
+_LP_HEAD="  ".join(_cut(h,w).ljust(w) for h,w in zip(_LP_HEADERS,_LP_WIDTHS))
+_LP_SEP="  ".join("─"*w for w in _LP_WIDTHS)
+
 def table_lp(agg: Dict[str, Dict]) -> str:
-    headers=["Venue","Pools","Liq","Vol24","Tx24","Quotes","Score"]; widths=[9,5,12,12,8,10,6]; aligns=["l","r","r","r","r","l","r"]
-    def cut(s,w): s=str(s); return s if len(s)<=w else s[:max(1,w-1)]+"…"
-    def c(v,w,a): s=cut(v,w); return s.rjust(w) if a=="r" else (s.center(w) if a=="c" else s.ljust(w))
     rows=[]
-    from .constants import LP_VENUES as ORDER
-    for v in ORDER:
+    for v in LP_VENUES:
         a=agg.get(v)
         if a:
-            rows.append([v.capitalize(), str(a["pools"]), f"${humanize(a['liq'])}", f"${humanize(a['vol'])}", f"{a['tx']}", ",".join(sorted(a["quotes"].keys())[:2]) or "—", f"{a['score']:.2f}"])
+            rows.append([v.capitalize(), str(a["pools"]), f"${humanize(a['liq'])}", f"${humanize(a['vol'])}", f"{a['tx']}", ",".join(heapq.nsmallest(2, a["quotes"])) or "—", f"{a['score']:.2f}"])
         else:
             rows.append([v.capitalize(), "0", "$—", "$—", "0", "—", "0.00"])
-    head="  ".join(c(h,w,'l') for h,w in zip(headers,widths))
-    sep="  ".join("─"*w for w in widths)
-    body="\n".join("  ".join(c(v,w,a) for v,w,a in zip(r,widths,aligns)) for r in rows) or "—"
-    return f"```\n{head}\n{sep}\n{body}\n```"
+    body="\n".join(_LP_ROW_FMT.format(*map(_cut, r, _LP_WIDTHS)) for r in rows) or "—"
+    return f"```\n{_LP_HEAD}\n{_LP_SEP}\n{body}\n```"
@@ -7,15 +7,21 @@ import aiohttp
 import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
-import pytz
 import asyncio
-import json
+import bisect
+import itertools
+import logging
+import orjson
 import random
+from collections import OrderedDict
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 
 # Optional GraphQL streaming deps (for real-time graduations)
 try:
     from gql import Client, gql
     from gql.transport.websockets import WebsocketsTransport
+    from gql.transport.exceptions import TransportProtocolError
     _GQL_AVAILABLE = True
 except Exception:
     _GQL_AVAILABLE = False
@@ -39,6 +45,10 @@ BITQUERY_ENDPOINT = _clean_env(os.getenv("BITQUERY_ENDPOINT")) or "https://graph
 BITQUERY_DEBUG = os.getenv("BITQUERY_DEBUG", "1").strip() not in ("0", "false", "False", "")
 BITQUERY_DEBUG_DUMP = os.getenv("BITQUERY_DEBUG_DUMP", "0").strip() in ("1", "true", "True")
 
+# Debug lines use lazy %-formatting, so with BITQUERY_DEBUG=0 they are never built.
+log = logging.getLogger("mc-bot.graduated")
+log.setLevel(logging.DEBUG if BITQUERY_DEBUG else logging.INFO)
+
 CHANNEL_ID = int(os.getenv("GRADUATED_CHANNEL", "1406150656527564908"))
 
 # Display threshold & concurrency
@@ -46,7 +56,7 @@ MIN_MC_DISPLAY = int(os.getenv("MIN_MC_DISPLAY", "100000"))
 MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
 
 # Pacific timezone
-PACIFIC_TZ = pytz.timezone("America/Los_Angeles")
+PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
 
 # Raydium (Mainnet) program addresses
 RAYDIUM = {
@@ -69,6 +79,7 @@ GRAD_STREAM_URL = _clean_env(os.getenv("BITQUERY_STREAM_URL")) or "wss://streami
 GRAD_STREAM_PROGRAM_ID = _clean_env(os.getenv("LB_PROGRAM_ID")) or RAYDIUM["launchlab"]
 GRAD_STREAM_POST = os.getenv("GRAD_STREAM_POST", "0").strip() in ("1","true","True")  # post live alerts? default off
 GRAD_STREAM_RETENTION_HOURS = int(os.getenv("GRAD_STREAM_RETENTION_HOURS", "72"))      # in-memory buffer TTL
+GRAD_STREAM_MAX_EVENTS = int(os.getenv("GRAD_STREAM_MAX_EVENTS", "50000"))            # per-launchpad cap
 
 # ---------------------------------------------------------------------
 # Helpers
@@ -96,9 +107,25 @@ def _parse_token_timestamp(t: Dict[str, Any]) -> Optional[dt.datetime]:
             s = s[:-1] + "+00:00"
         return dt.datetime.fromisoformat(s).astimezone(dt.timezone.utc)
     except Exception as e:
-        print(f"[DEBUG] Failed to parse timestamp {ts_raw}: {e}")
+        log.debug("Failed to parse timestamp %s: %s", ts_raw, e)
         return None
 
+def _parse_iso_z(s: str) -> dt.datetime:
+    """Fast path for Bitquery's 'YYYY-MM-DDTHH:MM:SS[.fff]Z' UTC timestamps; raises ValueError on other shapes."""
+    if s.endswith("Z"):
+        return dt.datetime.fromisoformat(s[:-1]).replace(tzinfo=dt.timezone.utc)
+    return dt.datetime.fromisoformat(s).astimezone(dt.timezone.utc)
+
+def _dump_json(path: str, data: Any) -> None:
+    """Debug dump; run via asyncio.to_thread so large payloads never block the loop."""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+@lru_cache(maxsize=4096)
+def _fmt_pt(epoch_sec: int) -> str:
+    """Pacific-time display string; rows from the same block share a second and hit the cache."""
+    return dt.datetime.fromtimestamp(epoch_sec, PACIFIC_TZ).strftime("%b %d, %Y • %I:%M:%S %p %Z")
+
 def human_money(x: float) -> str:
     try:
         n = float(x)
@@ -111,10 +138,47 @@ def human_money(x: float) -> str:
     return f"{n:,.2f}P"
 
 async def safe_send(channel: discord.TextChannel, content: str):
-    """Split long messages into <=2000 chunks and send them sequentially."""
+    """Split long messages into <=2000 chunks and send them sequentially (report order matters)."""
     limit = 2000
-    for i in range(0, len(content), limit):
-        await channel.send(content[i:i+limit])
+    if len(content) <= limit:
+        await channel.send(content); return
+    chunks = [content[i:i+limit] for i in range(0, len(content), limit)]
+    for chunk in chunks:
+        await channel.send(chunk)
+
+# Live stream posts go through one background sender so bursts never stall the
+# subscription loops; consecutive posts to a channel are coalesced into one message.
+_DISCORD_TX_Q: "asyncio.Queue[Tuple[discord.abc.Messageable, str]]" = asyncio.Queue(maxsize=1000)
+_TX_COALESCE_CHARS = 1800
+_TX_MIN_INTERVAL = 1.0  # stay under Discord's ~5 messages / 5 s per-channel bucket
+
+def _queue_post(channel: discord.abc.Messageable, content: str, tag: str) -> None:
+    try:
+        _DISCORD_TX_Q.put_nowait((channel, content))
+    except asyncio.QueueFull:
+        log.warning("%s stream post dropped: send queue full", tag)
+
+async def _discord_sender() -> None:
+    pending: Optional[Tuple[discord.abc.Messageable, str]] = None
+    while True:
+        ch, text = pending or await _DISCORD_TX_Q.get()
+        pending = None
+        while not _DISCORD_TX_Q.empty():
+            nxt_ch, nxt = _DISCORD_TX_Q.get_nowait()
+            if nxt_ch is not ch or len(text) + 2 + len(nxt) > _TX_COALESCE_CHARS:
+                pending = (nxt_ch, nxt)
+                break
+            text = f"{text}\n\n{nxt}"
+        try:
+            await ch.send(text)
+        except discord.HTTPException as e:
+            retry = getattr(e, "retry_after", None)
+            log.warning("Stream post error (HTTP %s): %s", e.status, e)
+            if retry:
+                await asyncio.sleep(retry)
+        except Exception as e:
+            log.warning("Stream post error: %s", e)
+        await asyncio.sleep(_TX_MIN_INTERVAL)
 
 def _utc_now_iso() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00","Z")
@@ -123,135 +187,106 @@ def _utc_now_iso() -> str:
 # In-memory stream stores
 # ---------------------------------------------------------------------
 
-# BONK
-_bonk_stream_lock = asyncio.Lock()
-_bonk_stream_events: Dict[str, Dict[str, Any]] = {}  # key = mint
+_STREAM_RETENTION = dt.timedelta(hours=GRAD_STREAM_RETENTION_HOURS)
+
+class StreamStore:
+    """Per-launchpad graduation events keyed by mint, plus a (parsed timestamp, mint)
+    list kept sorted with bisect so expiry and snapshot only touch the affected range.
+    Bounded to GRAD_STREAM_MAX_EVENTS and expired lazily on store/snapshot, so no
+    separate prune sweep is needed."""
+
+    def __init__(self, launchpad: str, source: str):
+        self.launchpad = launchpad
+        self.source = source
+        self._lock = asyncio.Lock()
+        self._events: Dict[str, Dict[str, Any]] = {}  # key = mint
+        self._index: List[Tuple[dt.datetime, str]] = []
+
+    def _insert(self, ev: Dict[str, Any]) -> None:
+        """Insert/refresh `ev` (keyed by its address), keeping the earliest timestamp per mint."""
+        mint = ev["address"]; ts_iso = ev["timestamp"]
+        old = self._events.get(mint)
+        if old is not None and not ts_iso < old["timestamp"]:
+            return  # canonical ISO-Z strings sort like their datetimes
+        try:
+            ts = _parse_iso_z(ts_iso)
+        except (TypeError, ValueError):
+            return
+        if old is not None:
+            i = bisect.bisect_left(self._index, (old["_ts"], mint))
+            if i < len(self._index) and self._index[i] == (old["_ts"], mint):
+                del self._index[i]
+        ev["_ts"] = ts  # parsed once here; prune/snapshot/report reuse it
+        self._events[mint] = ev
+        bisect.insort(self._index, (ts, mint))
+        if len(self._index) > GRAD_STREAM_MAX_EVENTS:
+            _, m = self._index.pop(0)  # evict the oldest
+            self._events.pop(m, None)
+
+    def _expire(self) -> None:
+        """Drop events older than the retention window. O(1) when nothing is stale:
+        only the oldest entry is checked before bisecting."""
+        cutoff = dt.datetime.now(dt.timezone.utc) - _STREAM_RETENTION
+        if not self._index or self._index[0][0] >= cutoff:
+            return
+        n = bisect.bisect_left(self._index, (cutoff,))
+        for _, m in self._index[:n]:
+            self._events.pop(m, None)
+        del self._index[:n]
+
+    async def store(self, mint: str, ts_iso: str, method: str, signature: str):
+        """Store/refresh a graduation event (idempotent on mint)."""
+        if not mint or mint == WSOL_MINT or not isinstance(ts_iso, str):
+            return
+        if len(ts_iso) > 20 and ts_iso[-1] == "Z":
+            ts_iso = ts_iso[:19] + "Z"  # fixed width so string order == time order
+        ev = {
+            "timestamp": ts_iso,              # ISO string with Z
+            "address": mint,                  # keep shape consistent with rest of code
+            "symbol": "—",
+            "name": "—",
+            "launchpad": self.launchpad,
+            "source": self.source,
+            "method": method,
+            "signature": signature,
+        }
+        async with self._lock:
+            self._insert(ev)
+            self._expire()
 
-async def _bonk_stream_store_event(mint: str, ts_iso: str, method: str, signature: str):
-    """Store/refresh a BONK graduation event (idempotent on mint)."""
-    if not mint or mint == WSOL_MINT:
-        return
-    ev = {
-        "timestamp": ts_iso,              # ISO string with Z
-        "address": mint,                  # keep shape consistent with rest of code
-        "symbol": "—",
-        "name": "—",
-        "launchpad": "bonk",
-        "source": "launchlab_stream",
-        "method": method,
-        "signature": signature,
-    }
-    async with _bonk_stream_lock:
-        # keep earliest timestamp if we somehow see multiple
-        if mint in _bonk_stream_events:
-            old = _bonk_stream_events[mint]
-            if _parse_token_timestamp({"timestamp": ts_iso}) < _parse_token_timestamp({"timestamp": old.get("timestamp")}):
-                _bonk_stream_events[mint] = ev
-        else:
-            _bonk_stream_events[mint] = ev
-
-async def _bonk_stream_prune():
-    """Drop events older than retention window to cap memory."""
-    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=GRAD_STREAM_RETENTION_HOURS)
-    async with _bonk_stream_lock:
-        for m in list(_bonk_stream_events.keys()):
-            ts = _parse_token_timestamp(_bonk_stream_events[m])
-            if not ts or ts < cutoff:
-                _bonk_stream_events.pop(m, None)
-
-async def _bonk_stream_snapshot(start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
-    """Copy events that fall within [start, end)."""
-    out: List[Dict[str, Any]] = []
-    async with _bonk_stream_lock:
-        for ev in _bonk_stream_events.values():
-            ts = _parse_token_timestamp(ev)
-            if ts and (start <= ts < end):
-                out.append(dict(ev))  # shallow copy
-    return out
+    async def snapshot(self, start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
+        """Copy events that fall within [start, end)."""
+        async with self._lock:
+            self._expire()
+            lo = bisect.bisect_left(self._index, (start,)); hi = bisect.bisect_left(self._index, (end,), lo)
+            return [dict(self._events[m]) for _, m in self._index[lo:hi]]  # shallow copies
 
-# BAGS
-_bags_stream_lock = asyncio.Lock()
-_bags_stream_events: Dict[str, Dict[str, Any]] = {}
+BONK_STORE = StreamStore("bonk", "launchlab_stream")
+BAGS_STORE = StreamStore("bags", "dbc_migration")
+HEAVEN_STORE = StreamStore("heaven", "heaven_pool_created")
 
-async def _bags_stream_store_event(mint: str, ts_iso: str, method: str, signature: str):
-    if not mint or mint == WSOL_MINT:
-        return
-    ev = {
-        "timestamp": ts_iso,
-        "address": mint,
-        "symbol": "—",
-        "name": "—",
-        "launchpad": "bags",
-        "source": "dbc_migration",
-        "method": method,
-        "signature": signature,
-    }
-    async with _bags_stream_lock:
-        if mint in _bags_stream_events:
-            old = _bags_stream_events[mint]
-            if _parse_token_timestamp({"timestamp": ts_iso}) < _parse_token_timestamp({"timestamp": old.get("timestamp")}):
-                _bags_stream_events[mint] = ev
-        else:
-            _bags_stream_events[mint] = ev
-
-async def _bags_stream_prune():
-    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=GRAD_STREAM_RETENTION_HOURS)
-    async with _bags_stream_lock:
-        for m in list(_bags_stream_events.keys()):
-            ts = _parse_token_timestamp(_bags_stream_events[m])
-            if not ts or ts < cutoff:
-                _bags_stream_events.pop(m, None)
-
-async def _bags_stream_snapshot(start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    async with _bags_stream_lock:
-        for ev in _bags_stream_events.values():
-            ts = _parse_token_timestamp(ev)
-            if ts and (start <= ts < end):
-                out.append(dict(ev))
-    return out
+# ---------------------------------------------------------------------
+# Shared HTTP session (Bitquery / Dexscreener / Moralis)
+# ---------------------------------------------------------------------
 
-# HEAVEN
-_heaven_stream_lock = asyncio.Lock()
-_heaven_stream_events: Dict[str, Dict[str, Any]] = {}
+_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
 
-async def _heaven_stream_store_event(mint: str, ts_iso: str, method: str, signature: str):
-    if not mint or mint == WSOL_MINT:
-        return
-    ev = {
-        "timestamp": ts_iso,
-        "address": mint,
-        "symbol": "—",
-        "name": "—",
-        "launchpad": "heaven",
-        "source": "heaven_pool_created",
-        "method": method,
-        "signature": signature,
-    }
-    async with _heaven_stream_lock:
-        if mint in _heaven_stream_events:
-            old = _heaven_stream_events[mint]
-            if _parse_token_timestamp({"timestamp": ts_iso}) < _parse_token_timestamp({"timestamp": old.get("timestamp")}):
-                _heaven_stream_events[mint] = ev
-        else:
-            _heaven_stream_events[mint] = ev
-
-async def _heaven_stream_prune():
-    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=GRAD_STREAM_RETENTION_HOURS)
-    async with _heaven_stream_lock:
-        for m in list(_heaven_stream_events.keys()):
-            ts = _parse_token_timestamp(_heaven_stream_events[m])
-            if not ts or ts < cutoff:
-                _heaven_stream_events.pop(m, None)
-
-async def _heaven_stream_snapshot(start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    async with _heaven_stream_lock:
-        for ev in _heaven_stream_events.values():
-            ts = _parse_token_timestamp(ev)
-            if ts and (start <= ts < end):
-                out.append(dict(ev))
-    return out
+def _get_session() -> aiohttp.ClientSession:
+    """Lazily create one pooled session so requests reuse TCP/TLS connections."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        _HTTP_SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS * 2, limit_per_host=MAX_CONCURRENT_REQUESTS,
+                                           ttl_dns_cache=300, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=20),
+        )
+    return _HTTP_SESSION
+
+async def _close_session() -> None:
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
 
 # ---------------------------------------------------------------------
 # Bitquery POST (API key first, Bearer fallback) + Health Check
@@ -267,130 +302,196 @@ def _headers_api_key(v: str) -> Dict[str, str]:
 def _headers_bearer(v: str) -> Dict[str, str]:
     return {"Content-Type": "application/json", "Authorization": f"Bearer {v}"}
 
+# The credential is fixed for the process, so its shape and both header sets are computed once.
+_BEARER_LIKE = _is_probably_bearer(BITQUERY_API_VALUE)
+_MODE_HEADERS = {"x-api-key": _headers_api_key(BITQUERY_API_VALUE), "bearer": _headers_bearer(BITQUERY_API_VALUE)}
+_SUCCESSFUL_MODE: Optional[str] = None  # auth mode of the last 200; later calls go straight to it
+
 async def _bitquery_post(session: aiohttp.ClientSession, payload: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
     """
     Try X-API-KEY first. If 401, retry as Bearer with the same value.
+    Once a mode succeeds it is remembered and used directly until it returns 401.
     Prints detailed debug including which mode was used and rate-limit headers.
     """
     if not BITQUERY_API_VALUE:
-        print("[DEBUG] No BITQUERY_API_KEY value set.")
+        log.warning("No BITQUERY_API_KEY value set.")
         return 401, None
 
     url = BITQUERY_ENDPOINT
+    body = orjson.dumps(payload)  # serialized once, reused across auth modes/retries
 
     async def _once(headers: Dict[str, str], mode: str):
         try:
-            if BITQUERY_DEBUG:
-                print(f"[DEBUG] Bitquery: POST {url} (mode={mode})")
-            async with session.post(url, json=payload, headers=headers, timeout=45) as r:
-                txt = await r.text()
-                if BITQUERY_DEBUG:
+            log.debug("Bitquery: POST %s (mode=%s)", url, mode)
+            async with session.post(url, data=body, headers=headers, timeout=45) as r:
+                raw = await r.read()
+                if log.isEnabledFor(logging.DEBUG):
                     rl = {
                         "limit": r.headers.get("x-ratelimit-limit") or r.headers.get("X-RateLimit-Limit"),
                         "rem": r.headers.get("x-ratelimit-remaining") or r.headers.get("X-RateLimit-Remaining"),
                         "reset": r.headers.get("x-ratelimit-reset") or r.headers.get("X-RateLimit-Reset"),
                     }
-                    print(f"[DEBUG] Bitquery resp status={r.status} ratelimit={rl}")
+                    log.debug("Bitquery resp status=%s ratelimit=%s", r.status, rl)
                 if r.status != 200:
-                    if BITQUERY_DEBUG:
-                        print(f"[DEBUG] Bitquery body (first 300): {txt[:300]}")
+                    log.debug("Bitquery body (first 300): %s", raw[:300].decode('utf-8', 'replace'))
                     return r.status, None
                 try:
-                    data = json.loads(txt)
+                    data = orjson.loads(raw)
                     return r.status, data
                 except Exception as e:
-                    print(f"[DEBUG] Bitquery JSON parse error: {e}")
+                    log.warning("Bitquery JSON parse error: %s", e)
                     return r.status, None
         except Exception as e:
-            print(f"[DEBUG] Bitquery POST exception ({mode}): {type(e).__name__}: {e}")
+            log.warning("Bitquery POST exception (%s): %s: %s", mode, type(e).__name__, e)
             return 0, None
 
-    # Prefer API key unless it looks like a bearer
-    tried_api = False
-    if not _is_probably_bearer(BITQUERY_API_VALUE):
-        tried_api = True
-        status, data = await _once(_headers_api_key(BITQUERY_API_VALUE), "x-api-key")
-        if status == 200:
-            if BITQUERY_DEBUG:
-                print("[DEBUG] Bitquery success using X-API-KEY mode")
-            return status, data
+    global _SUCCESSFUL_MODE
+    status, data = 401, None
+    mode = _SUCCESSFUL_MODE
+    if mode is not None:
+        status, data = await _once(_MODE_HEADERS[mode], mode)
         if status == 401:
-            print("[DEBUG] Bitquery 401 under X-API-KEY, retrying as Bearer")
-
-    # Bearer fallback
-    status, data = await _once(_headers_bearer(BITQUERY_API_VALUE), "bearer")
-    if status == 200 and BITQUERY_DEBUG:
-        print("[DEBUG] Bitquery success using Bearer mode")
+            log.debug("Bitquery 401 under %s, renegotiating auth mode", mode)
+            _SUCCESSFUL_MODE = mode = None
+
+    if mode is None:
+        # Prefer API key unless it looks like a bearer
+        mode = "bearer" if _BEARER_LIKE else "x-api-key"
+        if not _BEARER_LIKE:
+            status, data = await _once(_MODE_HEADERS["x-api-key"], "x-api-key")
+            if status == 401:
+                log.debug("Bitquery 401 under X-API-KEY, retrying as Bearer")
+        if status != 200:
+            # Bearer fallback
+            status, data = await _once(_MODE_HEADERS["bearer"], "bearer")
+            if status == 200:
+                mode = "bearer"
 
     # Retry on rate-limit or transient
     if status in (429, 500, 502, 503, 504, 0):
         await asyncio.sleep(0.5 + random.random())
-        mode = "bearer" if (not tried_api or _is_probably_bearer(BITQUERY_API_VALUE)) else "x-api-key"
-        headers = _headers_bearer(BITQUERY_API_VALUE) if mode == "bearer" else _headers_api_key(BITQUERY_API_VALUE)
-        if BITQUERY_DEBUG:
-            print(f"[DEBUG] Bitquery retry after status {status} (mode={mode})")
-        status, data = await _once(headers, mode)
+        log.debug("Bitquery retry after status %s (mode=%s)", status, mode)
+        status, data = await _once(_MODE_HEADERS[mode], mode)
+    if status == 200:
+        if _SUCCESSFUL_MODE != mode:
+            log.debug("Bitquery success using %s mode", mode)
+        _SUCCESSFUL_MODE = mode
     return status, data
 
 async def _bitquery_healthcheck() -> None:
     """Verify connectivity and log which auth mode works."""
     pv = BITQUERY_API_VALUE
-    print(f"[DEBUG] Bitquery endpoint: {BITQUERY_ENDPOINT}")
-    print(f"[DEBUG] Bitquery API value present: {bool(pv)}   shape: {'bearer-like' if _is_probably_bearer(pv) else 'apikey-like'}")
+    log.debug("Bitquery endpoint: %s", BITQUERY_ENDPOINT)
+    log.debug("Bitquery API value present: %s   shape: %s", bool(pv), 'bearer-like' if _is_probably_bearer(pv) else 'apikey-like')
     if not pv:
         return
     payload = {"query": "query HC { Solana { Blocks(limit: {count: 1}) { Time } } }", "variables": {}}
     try:
-        async with aiohttp.ClientSession() as session:
-            s, d = await _bitquery_post(session, payload)
-            if s == 200:
-                print("[DEBUG] Bitquery healthcheck OK ✅")
-                if BITQUERY_DEBUG_DUMP and d:
-                    with open("bitquery_healthcheck.json", "w") as f:
-                        json.dump(d, f, indent=2)
-            else:
-                print(f"[DEBUG] Bitquery healthcheck failed with status {s}")
+        session = _get_session()
+        s, d = await _bitquery_post(session, payload)
+        if s == 200:
+            log.info("Bitquery healthcheck OK ✅")
+            if BITQUERY_DEBUG_DUMP and d:
+                await asyncio.to_thread(_dump_json, "bitquery_healthcheck.json", d)
+        else:
+            log.warning("Bitquery healthcheck failed with status %s", s)
     except Exception as e:
-        print(f"[DEBUG] Bitquery healthcheck exception: {type(e).__name__}: {e}")
+        log.warning("Bitquery healthcheck exception: %s: %s", type(e).__name__, e)
 
 # ---------------------------------------------------------------------
 # Dexscreener metrics (for MC/Liq)
 # ---------------------------------------------------------------------
 
-async def _dexscreener_info(ca: str) -> Dict[str, Any]:
-    url = f"https://api.dexscreener.com/latest/dex/tokens/{ca}"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=12) as r:
-                if r.status != 200:
-                    print(f"[DEBUG] Dexscreener {ca} failed HTTP {r.status}")
-                    return {}
-                data = await r.json()
+# Short TTL cache for Dexscreener lookups: reports and graduations overlap, so the
+# same CA is often asked for again within seconds. Only successful lookups are kept.
+_DS_TTL = 30.0
+_DS_MAX = 2048
+_ds_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+_DS_BATCH = 30  # Dexscreener accepts up to 30 comma-separated addresses per call
+
+def _ds_summary(ca: str, pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # prefer pairs whose base token is the CA, then deepest liquidity (first wins ties)
+    ca_l = ca.lower()
+    best = None; best_exact = False; best_liq = 0.0
+    for p in pairs:
+        base = (p.get("baseToken") or {}).get("address")
+        exact = bool(base) and base.lower() == ca_l
+        liq = float((p.get("liquidity") or {}).get("usd") or 0.0)
+        if best is None or (exact, liq) > (best_exact, best_liq):
+            best = p; best_exact = exact; best_liq = liq
+
+    return {
+        "mc": float(best.get("marketCap") or 0.0),
+        "fdv": float(best.get("fdv") or 0.0),
+        "liq": best_liq,
+        "symbol": (best.get("baseToken") or {}).get("symbol") or "—",
+        "name": (best.get("baseToken") or {}).get("name") or "—",
+    }
 
-        pairs = data.get("pairs") or []
-        if not pairs:
-            print(f"[DEBUG] Dexscreener {ca} returned no pairs")
-            return {}
-
-        def score(p):
-            base = (p.get("baseToken") or {}).get("address")
-            liq = float((p.get("liquidity") or {}).get("usd") or 0.0)
-            exact = 1 if base and base.lower() == ca.lower() else 0
-            return (exact, liq)
-
-        best = max(pairs, key=score)
-
-        return {
-            "mc": float(best.get("marketCap") or 0.0),
-            "fdv": float(best.get("fdv") or 0.0),
-            "liq": float((best.get("liquidity") or {}).get("usd") or 0.0),
-            "symbol": (best.get("baseToken") or {}).get("symbol") or "—",
-            "name": (best.get("baseToken") or {}).get("name") or "—",
-        }
+async def _dexscreener_chunk(cas: List[str]) -> Dict[str, Dict[str, Any]]:
+    url = f"https://api.dexscreener.com/latest/dex/tokens/{','.join(cas)}"
+    try:
+        session = _get_session()
+        async with session.get(url, timeout=12) as r:
+            if r.status != 200:
+                log.debug("Dexscreener %s token(s) failed HTTP %s", len(cas), r.status)
+                return {}
+            data = orjson.loads(await r.read())
     except Exception as e:
-        print(f"[DEBUG] Dexscreener error for {ca}: {e}")
+        log.warning("Dexscreener error for %s token(s): %s", len(cas), e)
         return {}
 
+    # The combined response lists every pair for every address; split it back per token.
+    by_addr: Dict[str, List[Dict[str, Any]]] = {ca.lower(): [] for ca in cas}
+    for p in (data or {}).get("pairs") or []:
+        base = ((p.get("baseToken") or {}).get("address") or "").lower()
+        quote = ((p.get("quoteToken") or {}).get("address") or "").lower()
+        if base in by_addr: by_addr[base].append(p)
+        if quote in by_addr and quote != base: by_addr[quote].append(p)
+
+    out: Dict[str, Dict[str, Any]] = {}
+    now = time.monotonic()
+    for ca in cas:
+        pairs = by_addr[ca.lower()]
+        if not pairs:
+            log.debug("Dexscreener %s returned no pairs", ca)
+            continue
+        try:
+            info = _ds_summary(ca, pairs)
+        except Exception as e:
+            log.warning("Dexscreener error for %s: %s", ca, e)
+            continue
+        out[ca] = info
+        _ds_cache.pop(ca, None); _ds_cache[ca] = (now, info)
+    while len(_ds_cache) > _DS_MAX:
+        _ds_cache.popitem(last=False)
+    return out
+
+async def _dexscreener_info_bulk(cas: List[str]) -> Dict[str, Dict[str, Any]]:
+    """MC/liq/name per CA; cache hits are served locally, misses go out 30 per request."""
+    out: Dict[str, Dict[str, Any]] = {}
+    misses: List[str] = []
+    now = time.monotonic()
+    for ca in dict.fromkeys(cas):
+        hit = _ds_cache.get(ca)
+        if hit is not None and now - hit[0] < _DS_TTL:
+            out[ca] = hit[1]
+        else:
+            misses.append(ca)
+    if misses:
+        chunks = [misses[i:i+_DS_BATCH] for i in range(0, len(misses), _DS_BATCH)]
+        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        async def run(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            async with sem:
+                return await _dexscreener_chunk(chunk)
+        for part in await asyncio.gather(*(run(c) for c in chunks)):
+            out.update(part)
+    return out
+
+async def _dexscreener_info(ca: str) -> Dict[str, Any]:
+    return (await _dexscreener_info_bulk([ca])).get(ca, {})
+
 # ---------------------------------------------------------------------
 # PumpFun (Moralis)
 # ---------------------------------------------------------------------
@@ -402,43 +503,44 @@ async def _pumpfun_get_graduated(limit: int = 100) -> List[Dict[str, Any]]:
     path = "/token/mainnet/exchange/pumpfun/graduated"
     headers = {"X-API-Key": MORALIS_API_KEY}
     if not MORALIS_API_KEY:
-        print("[DEBUG] No MORALIS_API_KEY set")
+        log.warning("No MORALIS_API_KEY set")
         return []
 
-    async with aiohttp.ClientSession() as session:
-        for base in (MORALIS_GW, MORALIS_DI):
-            url = base + path
-            try:
-                async with session.get(url, headers=headers, params={"limit": str(limit)}, timeout=20) as r:
-                    if r.status != 200:
-                        print(f"[DEBUG] PumpFun Moralis {base} HTTP {r.status}")
-                        continue
-                    data = await r.json()
-                if isinstance(data, list):
-                    print(f"[DEBUG] PumpFun Moralis {base} returned list len={len(data)}")
-                    return data
-                if isinstance(data, dict):
-                    arr = data.get("result") or data.get("results") or data.get("items") or data.get("data")
-                    if isinstance(arr, list):
-                        print(f"[DEBUG] PumpFun Moralis {base} returned dict list len={len(arr)}")
-                        return arr
-            except Exception as e:
-                print(f"[DEBUG] PumpFun Moralis failed {base}{path} -> {e}")
-                continue
+    session = _get_session()
+    for base in (MORALIS_GW, MORALIS_DI):
+        url = base + path
+        try:
+            async with session.get(url, headers=headers, params={"limit": str(limit)}, timeout=20) as r:
+                if r.status != 200:
+                    log.debug("PumpFun Moralis %s HTTP %s", base, r.status)
+                    continue
+                data = orjson.loads(await r.read())
+            if isinstance(data, list):
+                log.debug("PumpFun Moralis %s returned list len=%s", base, len(data))
+                return data
+            if isinstance(data, dict):
+                arr = data.get("result") or data.get("results") or data.get("items") or data.get("data")
+                if isinstance(arr, list):
+                    log.debug("PumpFun Moralis %s returned dict list len=%s", base, len(arr))
+                    return arr
+        except Exception as e:
+            log.warning("PumpFun Moralis failed %s%s -> %s", base, path, e)
+            continue
     return []
 
 # ---------------------------------------------------------------------
 # Bonk (Raydium LaunchLab) via Bitquery — migration-first with deep debug
 # ---------------------------------------------------------------------
 
-def _extract_mints_from_instruction(instr: Dict[str, Any]) -> Set[str]:
-    mints: Set[str] = set()
+def _extract_mints_from_instruction(instr: Dict[str, Any]) -> List[str]:
+    """Non-WSOL mints in account order, deduped. Instructions carry only a handful of
+    accounts, so a list membership test beats building a set per row."""
+    mints: List[str] = []
     accounts = ((instr.get("Instruction") or {}).get("Accounts")) or []
     for acc in accounts:
-        tok = acc.get("Token") or {}
-        mint = tok.get("Mint")
-        if mint and mint != WSOL_MINT:
-            mints.add(mint)
+        mint = (acc.get("Token") or {}).get("Mint")
+        if mint and mint != WSOL_MINT and mint not in mints:
+            mints.append(mint)
     return mints
 
 async def _bonk_get_graduated_bitquery(start_time: dt.datetime, end_time: dt.datetime) -> List[Dict[str, Any]]:
@@ -449,16 +551,16 @@ async def _bonk_get_graduated_bitquery(start_time: dt.datetime, end_time: dt.dat
                    (helps when trades accompany graduation)
     """
     if not BITQUERY_API_VALUE:
-        print("[DEBUG] No Bitquery value set in .env (BITQUERY_API_KEY).")
+        log.warning("No Bitquery value set in .env (BITQUERY_API_KEY).")
         return []
 
     start_iso = start_time.strftime("%Y-%m-%dT%H:%M:%S")
     end_iso = end_time.strftime("%Y-%m-%dT%H:%M:%S")
 
-    if BITQUERY_DEBUG:
-        print("[DEBUG] === Bitquery LaunchLab Graduates ===")
-        print(f"[DEBUG] Window UTC:   {start_iso} -> {end_iso}")
-        print(f"[DEBUG] Window PT:    {start_time.astimezone(PACIFIC_TZ).isoformat()} -> {end_time.astimezone(PACIFIC_TZ).isoformat()}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("=== Bitquery LaunchLab Graduates ===")
+        log.debug("Window UTC:   %s -> %s", start_iso, end_iso)
+        log.debug("Window PT:    %s -> %s", start_time.astimezone(PACIFIC_TZ).isoformat(), end_time.astimezone(PACIFIC_TZ).isoformat())
 
     graduates: Dict[str, Dict[str, Any]] = {}
 
@@ -490,99 +592,96 @@ async def _bonk_get_graduated_bitquery(start_time: dt.datetime, end_time: dt.dat
     """
     variables = {"from": start_iso, "till": end_iso, "prog": RAYDIUM["launchlab"]}
 
-    async with aiohttp.ClientSession() as session:
-        if BITQUERY_DEBUG:
-            print("[DEBUG] Query A: LaunchLab migrations (migrate_to_amm / migrate_to_cpswap)")
-        sA, dA = await _bitquery_post(session, {"query": instr_query, "variables": variables})
-        rowsA = (((dA or {}).get("data") or {}).get("Solana") or {}).get("Instructions") or []
-        print(f"[DEBUG] Query A status={sA} rows={len(rowsA)} data_present={bool(dA)}")
-        if BITQUERY_DEBUG_DUMP and dA:
-            with open("bitquery_launchlab_migrations.json", "w") as f:
-                json.dump(dA, f, indent=2)
-
-        if rowsA:
-            # show sample
-            print("[DEBUG] Query A sample (up to 5):")
-            for r in rowsA[:5]:
-                method = ((r.get("Instruction") or {}).get("Program") or {}).get("Method")
-                ts = (r.get("Block") or {}).get("Time")
-                sig = (r.get("Transaction") or {}).get("Signature")
-                print(f"    - {ts} | {method} | tx={sig}")
+    session = _get_session()
+    log.debug("Query A: LaunchLab migrations (migrate_to_amm / migrate_to_cpswap)")
+    sA, dA = await _bitquery_post(session, {"query": instr_query, "variables": variables})
+    rowsA = (((dA or {}).get("data") or {}).get("Solana") or {}).get("Instructions") or []
+    log.debug("Query A status=%s rows=%s data_present=%s", sA, len(rowsA), bool(dA))
+    if BITQUERY_DEBUG_DUMP and dA:
+        await asyncio.to_thread(_dump_json, "bitquery_launchlab_migrations.json", dA)
+
+    if rowsA:
+        # show sample
+        log.debug("Migrations sample (up to 5):")
+        for r in rowsA[:5]:
+            method = ((r.get("Instruction") or {}).get("Program") or {}).get("Method")
+            ts = (r.get("Block") or {}).get("Time")
+            sig = (r.get("Transaction") or {}).get("Signature")
+            log.debug("    - %s | %s | tx=%s", ts, method, sig)
+
+        # extract mints from accounts
+        for r in rowsA:
+            ts = (r.get("Block") or {}).get("Time")
+            for mint in _extract_mints_from_instruction(r):
+                if mint not in graduates:
+                    graduates[mint] = {
+                        "timestamp": ts,
+                        "address": mint,
+                        "symbol": "—",
+                        "name": "—",
+                        "launchpad": "bonk",
+                        "source": "launchlab_migration",
+                    }
 
-            # extract mints from accounts
-            for r in rowsA:
-                ts = (r.get("Block") or {}).get("Time")
-                for mint in _extract_mints_from_instruction(r):
-                    if mint not in graduates:
-                        graduates[mint] = {
-                            "timestamp": ts,
-                            "address": mint,
-                            "symbol": "—",
-                            "name": "—",
-                            "launchpad": "bonk",
-                            "source": "launchlab_migration",
-                        }
-
-        # --------- B) Fallback: broadened trades on launchpad/program address ---------
-        if not graduates:
-            if BITQUERY_DEBUG:
-                print("[DEBUG] No migrations found in window — trying trades fallback (protocol OR program)")
-
-            trades_query = """
-            query LaunchpadTrades($from: DateTime, $till: DateTime, $prog: String!) {
-              Solana {
-                DEXTradeByTokens(
-                  where: {
-                    or: [
-                      { Trade: { Dex: { ProtocolName: { is: "raydium_launchpad" } } } },
-                      { Trade: { Dex: { ProgramAddress: { is: $prog } } } }
-                    ]
-                    Block: { Time: { after: $from, before: $till } }
-                  }
-                  orderBy: { ascending: Block_Time }
-                  limit: { count: 2000 }
-                ) {
-                  Block { Time }
-                  Trade {
-                    Dex { ProtocolName ProgramAddress }
-                    Currency { MintAddress Symbol Name }
-                  }
-                }
+    # --------- B) Fallback: broadened trades on launchpad/program address ---------
+    # Only paid for when the migrations query comes back empty.
+    if not graduates:
+        log.debug("No migrations found in window — trying trades fallback (protocol OR program)")
+
+        trades_query = """
+        query LaunchpadTrades($from: DateTime, $till: DateTime, $prog: String!) {
+          Solana {
+            DEXTradeByTokens(
+              where: {
+                or: [
+                  { Trade: { Dex: { ProtocolName: { is: "raydium_launchpad" } } } },
+                  { Trade: { Dex: { ProgramAddress: { is: $prog } } } }
+                ]
+                Block: { Time: { after: $from, before: $till } }
+              }
+              orderBy: { ascending: Block_Time }
+              limit: { count: 2000 }
+            ) {
+              Block { Time }
+              Trade {
+                Dex { ProtocolName ProgramAddress }
+                Currency { MintAddress Symbol Name }
               }
             }
-            """
-            sB, dB = await _bitquery_post(session, {"query": trades_query, "variables": variables})
-            rowsB = (((dB or {}).get("data") or {}).get("Solana") or {}).get("DEXTradeByTokens") or []
-            print(f"[DEBUG] Query B status={sB} rows={len(rowsB)} data_present={bool(dB)}")
-            if BITQUERY_DEBUG_DUMP and dB:
-                with open("bitquery_launchpad_trades.json", "w") as f:
-                    json.dump(dB, f, indent=2)
-
-            if rowsB:
-                print("[DEBUG] Query B sample (up to 5):")
-                for r in rowsB[:5]:
-                    cur = (r.get("Trade") or {}).get("Currency") or {}
-                    dex = (r.get("Trade") or {}).get("Dex") or {}
-                    print(f"    - {r.get('Block',{}).get('Time')} | mint={cur.get('MintAddress')} sym={cur.get('Symbol')} proto={dex.get('ProtocolName')} prog={dex.get('ProgramAddress')}")
-                for r in rowsB:
-                    cur = (r.get("Trade") or {}).get("Currency") or {}
-                    mint = cur.get("MintAddress")
-                    ts = (r.get("Block") or {}).get("Time")
-                    if mint and mint != WSOL_MINT and mint not in graduates:
-                        graduates[mint] = {
-                            "timestamp": ts,
-                            "address": mint,
-                            "symbol": cur.get("Symbol") or "—",
-                            "name": cur.get("Name") or "—",
-                            "launchpad": "bonk",
-                            "source": "launchpad_trades",
-                        }
-
-    print(f"[DEBUG] Bonk (LaunchLab) unique tokens: {len(graduates)}")
-    if graduates and BITQUERY_DEBUG:
-        print("[DEBUG] Unique mint sample (up to 5):")
+          }
+        }
+        """
+        sB, dB = await _bitquery_post(session, {"query": trades_query, "variables": variables})
+        rowsB = (((dB or {}).get("data") or {}).get("Solana") or {}).get("DEXTradeByTokens") or []
+        log.debug("Query B status=%s rows=%s data_present=%s", sB, len(rowsB), bool(dB))
+        if BITQUERY_DEBUG_DUMP and dB:
+            await asyncio.to_thread(_dump_json, "bitquery_launchpad_trades.json", dB)
+
+        if rowsB:
+            log.debug("Trades sample (up to 5):")
+            for r in rowsB[:5]:
+                cur = (r.get("Trade") or {}).get("Currency") or {}
+                dex = (r.get("Trade") or {}).get("Dex") or {}
+                log.debug("    - %s | mint=%s sym=%s proto=%s prog=%s", r.get('Block',{}).get('Time'), cur.get('MintAddress'), cur.get('Symbol'), dex.get('ProtocolName'), dex.get('ProgramAddress'))
+            for r in rowsB:
+                cur = (r.get("Trade") or {}).get("Currency") or {}
+                mint = cur.get("MintAddress")
+                ts = (r.get("Block") or {}).get("Time")
+                if mint and mint != WSOL_MINT and mint not in graduates:
+                    graduates[mint] = {
+                        "timestamp": ts,
+                        "address": mint,
+                        "symbol": cur.get("Symbol") or "—",
+                        "name": cur.get("Name") or "—",
+                        "launchpad": "bonk",
+                        "source": "launchpad_trades",
+                    }
+
+    log.debug("Bonk (LaunchLab) unique tokens: %s", len(graduates))
+    if graduates and log.isEnabledFor(logging.DEBUG):
+        log.debug("Unique mint sample (up to 5):")
         for m, info in list(graduates.items())[:5]:
-            print(f"    - {info['timestamp']} | {m}")
+            log.debug("    - %s | %s", info['timestamp'], m)
 
     return list(graduates.values())
 
@@ -590,7 +689,16 @@ async def _bonk_get_graduated_bitquery(start_time: dt.datetime, end_time: dt.dat
 # Bags: verify Bags mint via update authority
 # ---------------------------------------------------------------------
 
+# Update authority is fixed per mint, so answers are kept for a day (LRU-capped).
+_BAGS_AUTH_TTL = 24 * 3600.0
+_BAGS_AUTH_MAX = 10_000
+_bags_auth_cache: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+
 async def _is_bags_mint(session: aiohttp.ClientSession, mint: str) -> bool:
+    hit = _bags_auth_cache.get(mint)
+    if hit is not None and time.monotonic() - hit[0] < _BAGS_AUTH_TTL:
+        _bags_auth_cache.move_to_end(mint)
+        return hit[1]
     q = """
     query IsBags($mint: String!, $auth: String!) {
       Solana {
@@ -605,7 +713,12 @@ async def _is_bags_mint(session: aiohttp.ClientSession, mint: str) -> bool:
     """
     s, d = await _bitquery_post(session, {"query": q, "variables": {"mint": mint, "auth": BAGS_UPDATE_AUTH}})
     arr = (((d or {}).get("data") or {}).get("Solana") or {}).get("Transfers") or []
-    return bool(arr)
+    is_bags = bool(arr)
+    if s == 200 and d is not None:  # only cache definitive answers
+        _bags_auth_cache.pop(mint, None); _bags_auth_cache[mint] = (time.monotonic(), is_bags)
+        while len(_bags_auth_cache) > _BAGS_AUTH_MAX:
+            _bags_auth_cache.popitem(last=False)
+    return is_bags
 
 # ---------------------------------------------------------------------
 # Subscriptions (WebSocket) — BONK / BAGS / HEAVEN
@@ -676,237 +789,245 @@ subscription HeavenPoolCreates($program: String!) {
 }
 """
 
+# Parsed once; workers reuse the documents across reconnects.
+_BONK_SUB_DOC = gql(_BONK_SUBSCRIPTION) if _GQL_AVAILABLE else None
+_BAGS_SUB_DOC = gql(_BAGS_SUBSCRIPTION) if _GQL_AVAILABLE else None
+_HEAVEN_SUB_DOC = gql(_HEAVEN_SUBSCRIPTION) if _GQL_AVAILABLE else None
+
 # -------------------- Workers --------------------
 
-async def _bonk_stream_worker(discord_bot: Optional[discord.Client] = None):
-    """Persistent WebSocket subscriber with backoff; stores graduations and optional live post."""
-    if not GRAD_STREAM_ENABLE:
-        print("[DEBUG] BONK stream disabled via GRAD_STREAM_ENABLE=0")
-        return
-    if not BITQUERY_API_VALUE:
-        print("[DEBUG] BONK stream not started: missing BITQUERY_API_KEY")
-        return
-    if not _GQL_AVAILABLE:
-        print("[DEBUG] BONK stream not started: `gql[websockets]` not installed (`pip install gql[websockets]`)")
-        return
+def _stream_channel(discord_bot: Optional[discord.Client]) -> Optional[discord.abc.Messageable]:
+    """Live-post target, or None when posting is off or the channel can't receive messages."""
+    if not GRAD_STREAM_POST or discord_bot is None:
+        return None
+    ch = discord_bot.get_channel(CHANNEL_ID)
+    return ch if callable(getattr(ch, "send", None)) else None
+
+def _msg_rows(msg: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    sol = msg.get("Solana") if msg else None
+    return (sol.get("Instructions") if sol else None) or []
+
+def _extract_row(r: Dict[str, Any]) -> Tuple[Optional[str], str, str]:
+    """(block time, signature, program method) of a subscription row in one pass."""
+    blk = r.get("Block"); tx = r.get("Transaction"); instr = r.get("Instruction")
+    prog = instr.get("Program") if instr else None
+    return (blk.get("Time") if blk else None,
+            (tx.get("Signature") if tx else None) or "",
+            (prog.get("Method") if prog else None) or "")
+
+_STREAM_BACKOFF_MAX = 60
+_STREAM_STABLE_SECS = 30.0  # a connection must live this long before backoff resets
+
+def _stream_backoff(backoff: int, connected_at: Optional[float]) -> int:
+    """Reset the backoff ceiling only after a stable connection, so a quick
+    connect→fail loop keeps growing instead of masking a flapping upstream."""
+    if connected_at is not None and time.monotonic() - connected_at >= _STREAM_STABLE_SECS:
+        return 1
+    return backoff
+
+if _GQL_AVAILABLE:
+    class _OrjsonWebsocketsTransport(WebsocketsTransport):
+        """WebsocketsTransport that decodes frames with orjson; stream rows are deeply nested
+        Instruction/Accounts/Token dicts and stdlib json.loads dominated per-event CPU."""
+
+        def _parse_answer(self, answer):
+            try:
+                json_answer = orjson.loads(answer)
+            except orjson.JSONDecodeError:
+                raise TransportProtocolError(f"Server did not return a GraphQL result: {answer}")
+            if self.subprotocol == self.GRAPHQLWS_SUBPROTOCOL:
+                return self._parse_answer_graphqlws(json_answer)
+            return self._parse_answer_apollo(json_answer)
+
+def _grad_ws_client() -> "Client":
+    """One WS connection for every graduation subscription; gql multiplexes them by operation id."""
+    transport = _OrjsonWebsocketsTransport(
+        url=f"{GRAD_STREAM_URL}?token={BITQUERY_API_VALUE}",
+        subprotocols=["graphql-ws", "graphql-transport-ws"],
+        ping_interval=30,   # send a ws ping every 30s
+        pong_timeout=10,    # expect a pong within 10s
+    )
+    return Client(transport=transport, fetch_schema_from_transport=False)
+
+async def _bonk_handle(rows: List[Dict[str, Any]], post_ch: Optional[discord.abc.Messageable]) -> None:
+    """Store BONK LaunchLab → Raydium migrations; optional live post."""
+    for r in rows:
+        ts_iso, sig, method = _extract_row(r)
+        ts_iso = ts_iso or _utc_now_iso()
+        method = method or "migrate_to_amm"
+        # pull first mint
+        mint = None
+        for acc in ((r.get("Instruction") or {}).get("Accounts")) or []:
+            tok = acc.get("Token") or {}
+            if tok.get("Mint") and tok["Mint"] != WSOL_MINT:
+                mint = tok["Mint"]
+                break
+        if not mint:
+            continue
 
-    backoff = 1
-    while True:
-        try:
-            url = f"{GRAD_STREAM_URL}?token={BITQUERY_API_VALUE}"
-            transport = WebsocketsTransport(
-                url=url,
-                subprotocols=["graphql-ws", "graphql-transport-ws"],
-                ping_interval=30,   # send a ws ping every 30s
-                pong_timeout=10,    # expect a pong within 10s
+        await BONK_STORE.store(mint, ts_iso, method, sig)
+        ts_dt = _parse_token_timestamp({"timestamp": ts_iso})
+        pt_str = _fmt_pt(int(ts_dt.timestamp())) if ts_dt else ts_iso
+        log.info(
+            "[GRAD] BONK → Raydium | method=%s | mint=%s | tx=%s | timePT=%s",
+            method, mint, sig, pt_str,
+        )
+        if post_ch is not None:
+            raydium_kind = "AMM v4" if method == "migrate_to_amm" else "CPMM"
+            sig_url = f"https://solscan.io/tx/{sig}"
+            mint_url = f"https://solscan.io/token/{mint}"
+            msg_out = (
+                "🎓 **Graduated (BONK → Raydium)**\n"
+                f"• **Time (PT):** {pt_str}\n"
+                f"• **Method:** `{method}` ({raydium_kind})\n"
+                f"• **Mint:** [`{mint}`]({mint_url})\n"
+                f"• **Tx:** [{sig}]({sig_url})"
             )
-            async with Client(transport=transport, fetch_schema_from_transport=False) as session:
-                print(f"[DEBUG] BONK stream connected to {GRAD_STREAM_URL}")
-                query = gql(_BONK_SUBSCRIPTION)
-                variables = {"program": GRAD_STREAM_PROGRAM_ID}
-                async for msg in session.subscribe(query, variable_values=variables):
-                    rows = (((msg or {}).get("Solana") or {}).get("Instructions")) or []
-                    if not rows:
-                        continue
-                    for r in rows:
-                        ts_iso = (r.get("Block") or {}).get("Time") or _utc_now_iso()
-                        sig = (r.get("Transaction") or {}).get("Signature") or ""
-                        method = ((r.get("Instruction") or {}).get("Program") or {}).get("Method") or "migrate_to_amm"
-                        # pull first mint
-                        mint = None
-                        for acc in ((r.get("Instruction") or {}).get("Accounts")) or []:
-                            tok = acc.get("Token") or {}
-                            if tok.get("Mint") and tok["Mint"] != WSOL_MINT:
-                                mint = tok["Mint"]
-                                break
-                        if not mint:
-                            continue
-
-                        await _bonk_stream_store_event(mint, ts_iso, method, sig)
-                        await _bonk_stream_prune()
-                        ts_dt = _parse_token_timestamp({"timestamp": ts_iso})
-                        pt_str = ts_dt.astimezone(PACIFIC_TZ).strftime("%b %d, %Y • %I:%M:%S %p %Z") if ts_dt else ts_iso
-                        print(
-                            "[GRAD] BONK → Raydium | "
-                            f"method={method} | mint={mint} | tx={sig} | timePT={pt_str}"
-                        )
-                        if GRAD_STREAM_POST and discord_bot is not None:
-                            ch = discord_bot.get_channel(CHANNEL_ID)
-                            if ch and hasattr(ch, "send"):
-                                raydium_kind = "AMM v4" if method == "migrate_to_amm" else "CPMM"
-                                sig_url = f"https://solscan.io/tx/{sig}"
-                                mint_url = f"https://solscan.io/token/{mint}"
-                                ts_dt = _parse_token_timestamp({"timestamp": ts_iso})
-                                when = ts_dt.astimezone(PACIFIC_TZ).strftime("%b %d, %Y • %I:%M:%S %p %Z") if ts_dt else ts_iso
-                                msg_out = (
-                                    "🎓 **Graduated (BONK → Raydium)**\n"
-                                    f"• **Time (PT):** {when}\n"
-                                    f"• **Method:** `{method}` ({raydium_kind})\n"
-                                    f"• **Mint:** [`{mint}`]({mint_url})\n"
-                                    f"• **Tx:** [{sig}]({sig_url})"
-                                )
-                                try:
-                                    await ch.send(msg_out)
-                                except Exception as e:
-                                    print(f"[DEBUG] BONK stream post error: {e}")
-
-            backoff = 1  # reset on clean exit
-        except asyncio.CancelledError:
-            print("[DEBUG] BONK stream task cancelled")
-            return
-        except Exception as e:
-            print(f"[DEBUG] BONK stream error: {type(e).__name__}: {e}")
-            await asyncio.sleep(backoff)
-            backoff = min(backoff * 2, 60)
+            _queue_post(post_ch, msg_out, "BONK")
+
+async def _bags_handle(rows: List[Dict[str, Any]], post_ch: Optional[discord.abc.Messageable]) -> None:
+    """Keep only DBC migrations that are BAGS (by update authority)."""
+    https = _get_session()  # shared pool; authority checks reuse keep-alive connections
+    cands = []
+    for r in rows:
+        ts_iso, sig, method = _extract_row(r)
+        ts_iso = ts_iso or _utc_now_iso()
+        mints = _extract_mints_from_instruction(r)
+        if not mints:
+            continue
+        ts_dt = _parse_token_timestamp({"timestamp": ts_iso})  # once per row
+        pt_str = _fmt_pt(int(ts_dt.timestamp())) if ts_dt else ts_iso
+        for mint in mints:
+            cands.append((mint, ts_iso, method, sig, pt_str))
+    # authority checks for the whole message run concurrently
+    checks = await asyncio.gather(*(_is_bags_mint(https, c[0]) for c in cands), return_exceptions=True)
+    for (mint, ts_iso, method, sig, pt_str), is_bags in zip(cands, checks):
+        if isinstance(is_bags, BaseException):
+            log.warning("Bags authority check failed for %s: %s", mint, is_bags)
+            continue
+        if not is_bags:
+            continue
 
-async def _bags_stream_worker(discord_bot: Optional[discord.Client] = None):
-    """Stream DBC migrations; keep only those that are BAGS (by update authority)."""
-    if not GRAD_STREAM_ENABLE:
-        print("[DEBUG] BAGS stream disabled via GRAD_STREAM_ENABLE=0")
-        return
-    if not BITQUERY_API_VALUE:
-        print("[DEBUG] BAGS stream not started: missing BITQUERY_API_KEY")
-        return
-    if not _GQL_AVAILABLE:
-        print("[DEBUG] BAGS stream not started: `gql[websockets]` not installed (`pip install gql[websockets]`)")
-        return
+        await BAGS_STORE.store(mint, ts_iso, method, sig)
+        log.info(
+            "[GRAD] BAGS → DAMM | method=%s | mint=%s | tx=%s | timePT=%s",
+            method, mint, sig, pt_str,
+        )
 
-    backoff = 1
-    while True:
-        try:
-            url = f"{GRAD_STREAM_URL}?token={BITQUERY_API_VALUE}"
-            transport = WebsocketsTransport(
-                url=url,
-                subprotocols=["graphql-ws", "graphql-transport-ws"],
-                ping_interval=30,
-                pong_timeout=10,
+        if post_ch is not None:
+            msg_out = (
+                "👜 **Graduated (Bags / DBC → DAMM)**\n"
+                f"• **Time (PT):** {pt_str}\n"
+                f"• **Method:** `{method}`\n"
+                f"• **Mint:** [`{mint}`](https://solscan.io/token/{mint})\n"
+                f"• **Tx:** [{sig}](https://solscan.io/tx/{sig})"
             )
-            async with Client(transport=transport, fetch_schema_from_transport=False) as session:
-                print(f"[DEBUG] BAGS stream connected to {GRAD_STREAM_URL}")
-                query = gql(_BAGS_SUBSCRIPTION)
-                variables = {"program": METEORA_DBC_PROGRAM}
-                async for msg in session.subscribe(query, variable_values=variables):
-                    rows = (((msg or {}).get("Solana") or {}).get("Instructions")) or []
-                    if not rows:
-                        continue
-                    async with aiohttp.ClientSession() as https:
-                        for r in rows:
-                            ts_iso = (r.get("Block") or {}).get("Time") or _utc_now_iso()
-                            sig = (r.get("Transaction") or {}).get("Signature") or ""
-                            method = ((r.get("Instruction") or {}).get("Program") or {}).get("Method") or ""
-                            mints = _extract_mints_from_instruction(r)
-                            for mint in mints:
-                                if mint == WSOL_MINT:
-                                    continue
-                                try:
-                                    is_bags = await _is_bags_mint(https, mint)
-                                except Exception as e:
-                                    print(f"[DEBUG] Bags authority check failed for {mint}: {e}")
-                                    is_bags = False
-                                if not is_bags:
-                                    continue
-
-                                await _bags_stream_store_event(mint, ts_iso, method, sig)
-                                await _bags_stream_prune()
-                                ts_dt = _parse_token_timestamp({"timestamp": ts_iso})
-                                pt_str = ts_dt.astimezone(PACIFIC_TZ).strftime("%b %d, %Y • %I:%M:%S %p %Z") if ts_dt else ts_iso
-                                print(
-                                    "[GRAD] BAGS → DAMM | "
-                                    f"method={method} | mint={mint} | tx={sig} | timePT={pt_str}"
-                                )
-
-                                if GRAD_STREAM_POST and discord_bot is not None:
-                                    ch = discord_bot.get_channel(CHANNEL_ID)
-                                    if ch and hasattr(ch, "send"):
-                                        msg_out = (
-                                            "👜 **Graduated (Bags / DBC → DAMM)**\n"
-                                            f"• **Time (PT):** {pt_str}\n"
-                                            f"• **Method:** `{method}`\n"
-                                            f"• **Mint:** [`{mint}`](https://solscan.io/token/{mint})\n"
-                                            f"• **Tx:** [{sig}](https://solscan.io/tx/{sig})"
-                                        )
-                                        try:
-                                            await ch.send(msg_out)
-                                        except Exception as e:
-                                            print(f"[DEBUG] BAGS stream post error: {e}")
-
-            backoff = 1
-        except asyncio.CancelledError:
-            print("[DEBUG] BAGS stream task cancelled")
-            return
-        except Exception as e:
-            print(f"[DEBUG] BAGS stream error: {type(e).__name__}: {e}")
-            await asyncio.sleep(backoff)
-            backoff = min(backoff * 2, 60)
+            _queue_post(post_ch, msg_out, "BAGS")
+
+async def _heaven_handle(rows: List[Dict[str, Any]], post_ch: Optional[discord.abc.Messageable]) -> None:
+    """Heaven pool creates; treat as 'go-live' graduations."""
+    for r in rows:
+        ts_iso, sig, method = _extract_row(r)
+        ts_iso = ts_iso or _utc_now_iso()
+        mints = _extract_mints_from_instruction(r)
+        if not mints:
+            continue
+        ts_dt = _parse_token_timestamp({"timestamp": ts_iso})  # once per row
+        pt_str = _fmt_pt(int(ts_dt.timestamp())) if ts_dt else ts_iso
+        for mint in mints:
+            await HEAVEN_STORE.store(mint, ts_iso, method, sig)
+            log.info(
+                "[GRAD] HEAVEN → Pool Created | method=%s | mint=%s | tx=%s | timePT=%s",
+                method, mint, sig, pt_str,
+            )
+
+            if post_ch is not None:
+                msg_out = (
+                    "👼 **Heaven Pool Created (Go-Live)**\n"
+                    f"• **Time (PT):** {pt_str}\n"
+                    f"• **Method:** `{method}`\n"
+                    f"• **Mint:** [`{mint}`](https://solscan.io/token/{mint})\n"
+                    f"• **Tx:** [{sig}](https://solscan.io/tx/{sig})"
+                )
+                _queue_post(post_ch, msg_out, "HEAVEN")
+
+# name -> (subscription document, program variable, row handler)
+_GRAD_SUBSCRIPTIONS = (
+    ("BONK", _BONK_SUB_DOC, GRAD_STREAM_PROGRAM_ID, _bonk_handle),
+    ("BAGS", _BAGS_SUB_DOC, METEORA_DBC_PROGRAM, _bags_handle),
+    ("HEAVEN", _HEAVEN_SUB_DOC, HEAVEN_PROGRAM, _heaven_handle),
+)
+
+# In-flight row handlers; strong refs so pending tasks aren't garbage-collected.
+_STREAM_PENDING: Set[asyncio.Task] = set()
+_STREAM_PENDING_MAX = 256  # past this the reader awaits handlers inline (back-pressure)
+
+def _stream_handler_done(t: asyncio.Task) -> None:
+    _STREAM_PENDING.discard(t)
+    if not t.cancelled() and t.exception() is not None:
+        log.warning("Stream handler %s failed: %s", t.get_name(), t.exception())
+
+async def _grad_subscribe(session, name: str, doc, program: str, handle, post_ch) -> None:
+    """Read one subscription; handling (store, authority checks, posts) runs off the WS read path."""
+    async for msg in session.subscribe(doc, variable_values={"program": program}):
+        rows = _msg_rows(msg)
+        if not rows:
+            continue
+        if len(_STREAM_PENDING) >= _STREAM_PENDING_MAX:
+            await handle(rows, post_ch)
+            continue
+        t = asyncio.create_task(handle(rows, post_ch), name=name)
+        _STREAM_PENDING.add(t)
+        t.add_done_callback(_stream_handler_done)
+    log.info("%s subscription completed by server", name)
 
-async def _heaven_stream_worker(discord_bot: Optional[discord.Client] = None):
-    """Stream Heaven pool creates; treat as 'go-live' graduations."""
+async def _grad_stream_worker(discord_bot: Optional[discord.Client] = None):
+    """Persistent WebSocket subscriber with backoff; BONK/BAGS/HEAVEN share one connection.
+
+    Stores graduations and optionally live-posts them. Any subscription failing
+    tears down the connection, so there is a single reconnect/backoff path.
+    """
     if not GRAD_STREAM_ENABLE:
-        print("[DEBUG] HEAVEN stream disabled via GRAD_STREAM_ENABLE=0")
+        log.info("Graduation streams disabled via GRAD_STREAM_ENABLE=0")
         return
     if not BITQUERY_API_VALUE:
-        print("[DEBUG] HEAVEN stream not started: missing BITQUERY_API_KEY")
+        log.info("Graduation streams not started: missing BITQUERY_API_KEY")
         return
     if not _GQL_AVAILABLE:
-        print("[DEBUG] HEAVEN stream not started: `gql[websockets]` not installed (`pip install gql[websockets]`)")
+        log.info("Graduation streams not started: `gql[websockets]` not installed (`pip install gql[websockets]`)")
         return
 
-    backoff = 1
-    while True:
-        try:
-            url = f"{GRAD_STREAM_URL}?token={BITQUERY_API_VALUE}"
-            transport = WebsocketsTransport(
-                url=url,
-                subprotocols=["graphql-ws", "graphql-transport-ws"],
-                ping_interval=30,
-                pong_timeout=10,
-            )
-            async with Client(transport=transport, fetch_schema_from_transport=False) as session:
-                print(f"[DEBUG] HEAVEN stream connected to {GRAD_STREAM_URL}")
-                query = gql(_HEAVEN_SUBSCRIPTION)
-                variables = {"program": HEAVEN_PROGRAM}
-                async for msg in session.subscribe(query, variable_values=variables):
-                    rows = (((msg or {}).get("Solana") or {}).get("Instructions")) or []
-                    if not rows:
-                        continue
-                    for r in rows:
-                        ts_iso = (r.get("Block") or {}).get("Time") or _utc_now_iso()
-                        sig = (r.get("Transaction") or {}).get("Signature") or ""
-                        method = ((r.get("Instruction") or {}).get("Program") or {}).get("Method") or ""
-                        mints = [m for m in _extract_mints_from_instruction(r) if m != WSOL_MINT]
-                        for mint in mints:
-                            await _heaven_stream_store_event(mint, ts_iso, method, sig)
-                            await _heaven_stream_prune()
-                            ts_dt = _parse_token_timestamp({"timestamp": ts_iso})
-                            pt_str = ts_dt.astimezone(PACIFIC_TZ).strftime("%b %d, %Y • %I:%M:%S %p %Z") if ts_dt else ts_iso
-                            print(
-                                "[GRAD] HEAVEN → Pool Created | "
-                                f"method={method} | mint={mint} | tx={sig} | timePT={pt_str}"
-                            )
-
-                            if GRAD_STREAM_POST and discord_bot is not None:
-                                ch = discord_bot.get_channel(CHANNEL_ID)
-                                if ch and hasattr(ch, "send"):
-                                    msg_out = (
-                                        "👼 **Heaven Pool Created (Go-Live)**\n"
-                                        f"• **Time (PT):** {pt_str}\n"
-                                        f"• **Method:** `{method}`\n"
-                                        f"• **Mint:** [`{mint}`](https://solscan.io/token/{mint})\n"
-                                        f"• **Tx:** [{sig}](https://solscan.io/tx/{sig})"
-                                    )
-                                    try:
-                                        await ch.send(msg_out)
-                                    except Exception as e:
-                                        print(f"[DEBUG] HEAVEN stream post error: {e}")
-
-            backoff = 1
-        except asyncio.CancelledError:
-            print("[DEBUG] HEAVEN stream task cancelled")
-            return
-        except Exception as e:
-            print(f"[DEBUG] HEAVEN stream error: {type(e).__name__}: {e}")
-            await asyncio.sleep(backoff)
-            backoff = min(backoff * 2, 60)
+    # The Discord sender only runs while this worker can produce live posts.
+    sender = asyncio.create_task(_discord_sender()) if GRAD_STREAM_POST and discord_bot is not None else None
+    try:
+        backoff = 1
+        while True:
+            connected_at: Optional[float] = None
+            try:
+                async with _grad_ws_client() as session:
+                    connected_at = time.monotonic()
+                    post_ch = _stream_channel(discord_bot)  # resolved once per connection
+                    log.info("Graduation streams connected to %s (%s)", GRAD_STREAM_URL,
+                             ", ".join(s[0] for s in _GRAD_SUBSCRIPTIONS))
+                    subs = [asyncio.create_task(_grad_subscribe(session, *s, post_ch)) for s in _GRAD_SUBSCRIPTIONS]
+                    try:
+                        await asyncio.gather(*subs)
+                    finally:
+                        for t in subs:
+                            t.cancel()
+                        await asyncio.gather(*subs, return_exceptions=True)
+
+                backoff = _stream_backoff(backoff, connected_at)
+            except asyncio.CancelledError:
+                log.info("Graduation stream task cancelled")
+                return
+            except Exception as e:
+                log.warning("Graduation stream error: %s: %s", type(e).__name__, e)
+                backoff = _stream_backoff(backoff, connected_at)
+                await asyncio.sleep(random.uniform(0, backoff))  # full jitter: bots sharing a key don't reconnect in lock-step
+                backoff = min(backoff * 2, _STREAM_BACKOFF_MAX)
+    finally:
+        if sender is not None: sender.cancel()
 
 # ---------------------------------------------------------------------
 # Aggregator
@@ -915,79 +1036,76 @@ async def _heaven_stream_worker(discord_bot: Optional[discord.Client] = None):
 async def _fetch_recent_graduates_all(start: dt.datetime, end: dt.datetime, limit: int = 100) -> Dict[str, List[Dict[str, Any]]]:
     results: Dict[str, List[Dict[str, Any]]] = {}
 
-    print("\n[DEBUG] === Fetching PumpFun tokens ===")
-    results["pumpfun"] = await _pumpfun_get_graduated(limit)
-
-    print("\n[DEBUG] === Fetching Bonk tokens (Raydium LaunchLab via Bitquery) ===")
-    query_bonk = await _bonk_get_graduated_bitquery(start, end)
-
-    print("\n[DEBUG] === Snapshot Bonk tokens (stream buffer) ===")
-    snap_bonk = await _bonk_stream_snapshot(start, end)
-    print(f"[DEBUG] BONK stream snapshot count in window: {len(snap_bonk)}")
-
-    # Deduplicate: prefer 'launchlab_migration' (query) over 'launchlab_stream'
-    dedup: Dict[str, Dict[str, Any]] = {}
-    for row in (query_bonk + snap_bonk):
+    # The sources are independent, so fetch them together: wall time is the slowest one.
+    log.debug("=== Fetching PumpFun + Bonk (Bitquery) tokens and stream snapshots ===")
+    pumpfun, query_bonk, snap_bonk, snap_bags, snap_heaven = await asyncio.gather(
+        _pumpfun_get_graduated(limit),
+        _bonk_get_graduated_bitquery(start, end),
+        BONK_STORE.snapshot(start, end),
+        BAGS_STORE.snapshot(start, end),
+        HEAVEN_STORE.snapshot(start, end),
+    )
+    results["pumpfun"] = pumpfun
+    log.debug("BONK stream snapshot count in window: %s", len(snap_bonk))
+
+    # Deduplicate: query rows ('launchlab_migration') come first, so first-seen wins
+    # over 'launchlab_stream' without a second overwrite pass.
+    seen: Set[str] = set()
+    bonk: List[Dict[str, Any]] = []
+    for row in itertools.chain(query_bonk, snap_bonk):
         mint = (row.get("address") or row.get("mint") or "").strip()
-        if not mint:
-            continue
-        if mint not in dedup:
-            dedup[mint] = row
-        else:
-            if dedup[mint].get("source") != "launchlab_migration" and row.get("source") == "launchlab_migration":
-                dedup[mint] = row
+        if mint and mint not in seen:
+            seen.add(mint)
+            bonk.append(row)
 
-    results["bonk"] = list(dedup.values())
+    results["bonk"] = bonk
 
-    print("\n[DEBUG] === Snapshot Bags tokens (stream buffer) ===")
-    results["bags"] = await _bags_stream_snapshot(start, end)
-    print(f"[DEBUG] BAGS stream snapshot count in window: {len(results['bags'])}")
+    results["bags"] = snap_bags
+    log.debug("BAGS stream snapshot count in window: %s", len(snap_bags))
 
-    print("\n[DEBUG] === Snapshot Heaven tokens (stream buffer) ===")
-    results["heaven"] = await _heaven_stream_snapshot(start, end)
-    print(f"[DEBUG] HEAVEN stream snapshot count in window: {len(results['heaven'])}")
+    results["heaven"] = snap_heaven
+    log.debug("HEAVEN stream snapshot count in window: %s", len(snap_heaven))
 
-    print("\n[DEBUG] === Fetch Summary ===")
+    log.debug("=== Fetch Summary ===")
     for lp, tokens in results.items():
-        print(f"[DEBUG] {lp}: {len(tokens)} tokens fetched")
+        log.debug("%s: %s tokens fetched", lp, len(tokens))
     return results
 
 # ---------------------------------------------------------------------
 # Cog
 # ---------------------------------------------------------------------
 
+# Report line templates; ONLY the token name is clickable to GMGN, no extra links.
+_LINE_FMT = "• [{name} ({symbol})](<https://gmgn.ai/sol/token/{ca}>) — MC: {mc:>7}   Liq: {liq:>7}"
+_LINE_FMT_NOCA = "• {name} ({symbol}) — MC: {mc:>7}   Liq: {liq:>7}"
+_BANNER_FIRE = "🔥" * 21   # busy window (> 10 graduates)
+_BANNER_ICE = "🧊" * 17    # quiet window (< 4 graduates)
+_BANNER_BAR = "-" * 42
+
 class GraduatedCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._healthcheck_done = False
-        self._bonk_stream_task: Optional[asyncio.Task] = None
-        self._bags_stream_task: Optional[asyncio.Task] = None
-        self._heaven_stream_task: Optional[asyncio.Task] = None
+        self._stream_task: Optional[asyncio.Task] = None
         self.hourly_graduated_report.start()
 
-    def cog_unload(self):
+    async def cog_unload(self):
         self.hourly_graduated_report.cancel()
-        for t in (self._bonk_stream_task, self._bags_stream_task, self._heaven_stream_task):
-            if t and not t.done():
-                t.cancel()
+        if self._stream_task and not self._stream_task.done():
+            self._stream_task.cancel()  # the worker cancels its Discord sender on exit
+        await _close_session()
 
     @commands.Cog.listener()
     async def on_ready(self):
         pass
         # Start real-time streams once
-        # if self._bonk_stream_task is None and GRAD_STREAM_ENABLE and BITQUERY_API_VALUE and _GQL_AVAILABLE:
-        #     self._bonk_stream_task = asyncio.create_task(_bonk_stream_worker(self.bot))
-        #     print("[DEBUG] BONK graduation stream task started.")
-        # if self._bags_stream_task is None and GRAD_STREAM_ENABLE and BITQUERY_API_VALUE and _GQL_AVAILABLE:
-        #     self._bags_stream_task = asyncio.create_task(_bags_stream_worker(self.bot))
-        #     print("[DEBUG] BAGS graduation stream task started.")
-        # if self._heaven_stream_task is None and GRAD_STREAM_ENABLE and BITQUERY_API_VALUE and _GQL_AVAILABLE:
-        #     self._heaven_stream_task = asyncio.create_task(_heaven_stream_worker(self.bot))
-        #     print("[DEBUG] HEAVEN go-live stream task started.")
+        # if self._stream_task is None and GRAD_STREAM_ENABLE and BITQUERY_API_VALUE and _GQL_AVAILABLE:
+        #     self._stream_task = asyncio.create_task(_grad_stream_worker(self.bot))
+        #     log.info("BONK/BAGS/HEAVEN graduation stream task started.")
 
     @tasks.loop(hours=1)
     async def hourly_graduated_report(self):
-        print("\n[DEBUG] ========== Starting Hourly Graduated Report ==========")
+        log.debug("========== Starting Hourly Graduated Report ==========")
 
         if not self._healthcheck_done:
             await _bitquery_healthcheck()
@@ -996,24 +1114,22 @@ class GraduatedCog(commands.Cog):
         end = dt.datetime.now(dt.timezone.utc)
         start = end - dt.timedelta(hours=1)
 
-        print(f"[DEBUG] Report time window: {start.isoformat()} to {end.isoformat()}")
+        log.debug("Report time window: %s to %s", start.isoformat(), end.isoformat())
 
         try:
             msg = await self.fetch_report(start, end)
         except Exception as e:
-            print(f"[DEBUG] Report generation error: {type(e).__name__}: {e}")
-            import traceback
-            print(f"[DEBUG] Traceback: {traceback.format_exc()}")
+            log.exception("Report generation error: %s: %s", type(e).__name__, e)
             msg = f"⚠️ Graduated report error: {e}"
 
         ch = self.bot.get_channel(CHANNEL_ID)
         if ch:
-            print(f"[DEBUG] Sending report to channel {CHANNEL_ID}")
+            log.debug("Sending report to channel %s", CHANNEL_ID)
             await safe_send(ch, msg)
         else:
-            print(f"[DEBUG] ERROR: Could not find channel {CHANNEL_ID}")
+            log.error("Could not find channel %s", CHANNEL_ID)
 
-        print("[DEBUG] ========== Report Complete ==========\n")
+        log.debug("========== Report Complete ==========")
 
     @hourly_graduated_report.before_loop
     async def _wait_ready(self):
@@ -1022,25 +1138,25 @@ class GraduatedCog(commands.Cog):
     async def get_recent_graduates(self, start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
         tokens_by_lp = await _fetch_recent_graduates_all(start, end, limit=100)
 
-        print("\n[DEBUG] === Filtering tokens by time window ===")
+        log.debug("=== Filtering tokens by time window ===")
         for lp, tokens in tokens_by_lp.items():
-            print(f"[DEBUG] {lp}: {len(tokens)} raw tokens before time filtering")
+            log.debug("%s: %s raw tokens before time filtering", lp, len(tokens))
 
         grads: List[Dict[str, Any]] = []
         for lp, tokens in tokens_by_lp.items():
             filtered_count = 0
             for t in tokens:
-                ts = _parse_token_timestamp(t)
+                ts = t.get("_ts") or _parse_token_timestamp(t)
                 if ts and (start <= ts < end):
                     grads.append({**t, "launchpad": lp})
                     filtered_count += 1
-            print(f"[DEBUG] {lp}: {filtered_count} tokens after time filtering")
+            log.debug("%s: %s tokens after time filtering", lp, filtered_count)
 
-        print(f"[DEBUG] Total graduated tokens in window: {len(grads)}")
+        log.debug("Total graduated tokens in window: %s", len(grads))
         return grads
 
     async def fetch_report(self, start: dt.datetime, end: dt.datetime) -> str:
-        print("[DEBUG] Fetching graduated tokens...")
+        log.debug("Fetching graduated tokens...")
         grads = await self.get_recent_graduates(start, end)
 
         window_str = (
@@ -1051,19 +1167,18 @@ class GraduatedCog(commands.Cog):
         if not grads:
             return f"🕒 {window_str}: No tokens graduated."
 
-        print(f"\n[DEBUG] === Fetching market cap data for {len(grads)} tokens ===")
+        log.debug("=== Fetching market cap data for %s tokens ===", len(grads))
 
-        # Fetch market cap data for all tokens (bounded concurrency)
-        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Fetch market cap data for all tokens in bulk (30 CAs per Dexscreener call)
+        cas = [(g.get("mint") or g.get("address") or g.get("tokenAddress") or "").strip() for g in grads]
+        infos = await _dexscreener_info_bulk([ca for ca in cas if ca])
 
-        async def enrich(g: Dict[str, Any]):
-            ca = (g.get("mint") or g.get("address") or g.get("tokenAddress") or "").strip()
+        for g, ca in zip(grads, cas):
             if not ca:
                 g["mc_val"] = 0.0
                 g["liq_val"] = 0.0
-                return g
-            async with sem:
-                ds = await _dexscreener_info(ca)
+                continue
+            ds = infos.get(ca)
             if ds:
                 g["mc_val"] = ds["mc"]
                 g["liq_val"] = ds["liq"]
@@ -1072,113 +1187,92 @@ class GraduatedCog(commands.Cog):
             else:
                 g["mc_val"] = float(g.get("marketCap", 0.0))
                 g["liq_val"] = float(g.get("liquidity", 0.0))
-            return g
-
-        grads = await asyncio.gather(*(enrich(g) for g in grads))
-
-        # Separate by platform and filter by market cap
-        pumpfun_grads = [g for g in grads if g.get("launchpad") == "pumpfun"]
-        bonk_grads = [g for g in grads if g.get("launchpad") == "bonk"]
-        bags_grads = [g for g in grads if g.get("launchpad") == "bags"]
-        heaven_grads = [g for g in grads if g.get("launchpad") == "heaven"]
-        other_grads = [g for g in grads if g.get("launchpad") not in ["pumpfun", "bonk", "bags", "heaven"]]
-
-        print(f"\n[DEBUG] === Platform breakdown ===")
-        print(f"[DEBUG] PumpFun: {len(pumpfun_grads)} tokens")
-        print(f"[DEBUG] Bonk: {len(bonk_grads)} tokens")
-        print(f"[DEBUG] Bags: {len(bags_grads)} tokens")
-        print(f"[DEBUG] Heaven: {len(heaven_grads)} tokens")
-        print(f"[DEBUG] Other: {len(other_grads)} tokens")
-
-        # Filter for display (only show >= threshold)
-        pumpfun_display = [g for g in pumpfun_grads if g.get("mc_val", 0) >= MIN_MC_DISPLAY]
-        bonk_display = [g for g in bonk_grads if g.get("mc_val", 0) >= MIN_MC_DISPLAY]
-        bags_display = [g for g in bags_grads if g.get("mc_val", 0) >= MIN_MC_DISPLAY]
-        heaven_display = [g for g in heaven_grads if g.get("mc_val", 0) >= MIN_MC_DISPLAY]
-        other_display = [g for g in other_grads if g.get("mc_val", 0) >= MIN_MC_DISPLAY]
-
-        print(f"\n[DEBUG] === After {MIN_MC_DISPLAY:,} MC filter ===")
-        print(f"[DEBUG] PumpFun display: {len(pumpfun_display)} tokens")
-        print(f"[DEBUG] Bonk display: {len(bonk_display)} tokens")
-        print(f"[DEBUG] Bags display: {len(bags_display)} tokens")
-        print(f"[DEBUG] Heaven display: {len(heaven_display)} tokens")
-        print(f"[DEBUG] Other display: {len(other_display)} tokens")
+
+        # Separate by platform, filter by market cap and count — all in one pass
+        buckets: Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            lp: ([], []) for lp in ("pumpfun", "bonk", "bags", "heaven", "other")
+        }
+        other = buckets["other"]
+        counts: Dict[str, int] = {}
+        for g in grads:
+            lp = g.get("launchpad", "unknown")
+            counts[lp] = counts.get(lp, 0) + 1
+            all_list, disp_list = buckets.get(lp, other)
+            all_list.append(g)
+            if g.get("mc_val", 0) >= MIN_MC_DISPLAY:
+                disp_list.append(g)
+        pumpfun_grads, pumpfun_display = buckets["pumpfun"]
+        bonk_grads, bonk_display = buckets["bonk"]
+        bags_grads, bags_display = buckets["bags"]
+        heaven_grads, heaven_display = buckets["heaven"]
+        other_grads, other_display = other
+
+        log.debug("=== Platform breakdown ===")
+        log.debug("PumpFun: %s tokens", len(pumpfun_grads))
+        log.debug("Bonk: %s tokens", len(bonk_grads))
+        log.debug("Bags: %s tokens", len(bags_grads))
+        log.debug("Heaven: %s tokens", len(heaven_grads))
+        log.debug("Other: %s tokens", len(other_grads))
+
+        log.debug("=== After %s MC filter ===", f"{MIN_MC_DISPLAY:,}")
+        log.debug("PumpFun display: %s tokens", len(pumpfun_display))
+        log.debug("Bonk display: %s tokens", len(bonk_display))
+        log.debug("Bags display: %s tokens", len(bags_display))
+        log.debug("Heaven display: %s tokens", len(heaven_display))
+        log.debug("Other display: %s tokens", len(other_display))
 
         # Build report sections
-        report_sections: List[str] = []
+        n = len(grads)
+        banner = _BANNER_FIRE if n > 10 else _BANNER_ICE if n < 4 else _BANNER_BAR
+        report_sections: List[str] = [banner]
 
         # Header (show total counts including sub-threshold tokens)
-        if len(grads) > 10:
-            report_sections.append('🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥')
-        elif len(grads) < 4:
-            report_sections.append("🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊")
-        else:
-            report_sections.append("------------------------------------------")
         report_sections.append(
             f"\n🕒 Graduated between {window_str}\n"
-            f"🎓 Total: **{len(grads)}** tokens\n"
+            f"🎓 Total: **{n}** tokens\n"
         )
 
         # Summary counts (all tokens)
-        counts: Dict[str, int] = {}
-        for g in grads:
-            lp = g.get("launchpad", "unknown")
-            counts[lp] = counts.get(lp, 0) + 1
         breakdown = "\n".join(f"   {lp}: {n}" for lp, n in counts.items())
         report_sections.append(f"{breakdown}\n")
 
         # Section divider
-        if len(grads) > 10:
-            report_sections.append('🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥🔥')
-        elif len(grads) < 4:
-            report_sections.append("🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊🧊")
-        else:
-            report_sections.append("------------------------------------------")
+        report_sections.append(banner)
+
+        money = human_money
 
         def _line(g: Dict[str, Any]) -> str:
             ca = (g.get("mint") or g.get("address") or g.get("tokenAddress") or "").strip()
-            name = g.get("name", "—")
-            symbol = g.get("symbol", "—")
-            mc_val = g.get("mc_val", 0)
-            liq_val = g.get("liq_val", 0)
-            gmgn_url = f"<https://gmgn.ai/sol/token/{ca}>" if ca else ""
-            # ONLY the token name is clickable to GMGN; no extra links.
-            if gmgn_url:
-                title = f"[{name} ({symbol})]({gmgn_url})"
-            else:
-                title = f"{name} ({symbol})"
-            return f"• {title} — MC: {human_money(mc_val):>7}   Liq: {human_money(liq_val):>7}"
+            return (_LINE_FMT if ca else _LINE_FMT_NOCA).format_map({
+                "ca": ca, "name": g.get("name", "—"), "symbol": g.get("symbol", "—"),
+                "mc": money(g.get("mc_val", 0)), "liq": money(g.get("liq_val", 0)),
+            })
 
         # Sections
         if pumpfun_display:
             report_sections.append("\n📈 **PUMPFUN GRADUATES** (MC ≥ 100K)")
-            for g in pumpfun_display:
-                report_sections.append(_line(g))
+            report_sections.extend(map(_line, pumpfun_display))
 
         if bonk_display:
             report_sections.append("\n🚀 **BONK / LAUNCHLAB GRADUATES** (MC ≥ 100K)")
-            for g in bonk_display:
-                report_sections.append(_line(g))
+            report_sections.extend(map(_line, bonk_display))
 
         if bags_display:
             report_sections.append("\n💼 **BAGS (DBC → DAMM) GRADUATES** (MC ≥ 100K)")
-            for g in bags_display:
-                report_sections.append(_line(g))
+            report_sections.extend(map(_line, bags_display))
 
         if heaven_display:
             report_sections.append("\n👼 **HEAVEN GO-LIVE** (MC ≥ 100K)")
-            for g in heaven_display:
-                report_sections.append(_line(g))
+            report_sections.extend(map(_line, heaven_display))
 
         if other_display:
             report_sections.append("\n🎯 **OTHER PLATFORMS** (MC ≥ 100K)")
-            for g in other_display:
-                report_sections.append(_line(g))
+            report_sections.extend(map(_line, other_display))
 
-        if len(grads) > 0 and (len(pumpfun_display) + len(bonk_display) + len(bags_display) + len(heaven_display) + len(other_display) == 0):
+        if n > 0 and (len(pumpfun_display) + len(bonk_display) + len(bags_display) + len(heaven_display) + len(other_display) == 0):
             report_sections.append("\n💡 All graduated tokens are currently under the display threshold")
 
-        print("[DEBUG] Report generation complete")
+        log.debug("Report generation complete")
         return "\n".join(report_sections)
 
 async def setup(bot: commands.Bot):
@@ -1,5 +1,5 @@
 # graduation_watcher.py
-# Requires: discord.py (2.x), gql[websockets], python-dateutil, pytz
+# Requires: discord.py (2.x), gql[websockets], python-dateutil
 #
 # Env:
 # - DISCORD_TOKEN                (for your bot process, not used directly here)
@@ -16,8 +16,10 @@
 # - Times are formatted in America/Los_Angeles with am/pm
 
 import asyncio
+import functools
 import logging
 import os
+import random
 from typing import Optional, List
 
 import discord
@@ -26,7 +28,7 @@ from discord.ext import commands
 from gql import Client, gql
 from gql.transport.websockets import WebsocketsTransport
 
-from datetime import datetime
+from datetime import datetime, timezone
 from dateutil import tz
 
 log = logging.getLogger(__name__)
@@ -35,6 +37,13 @@ logging.basicConfig(level=logging.INFO)
 LAUNCHLAB_PROGRAM_DEFAULT = "LanMV9sAd7wArD4vJFi2qDdfnVhFxYSUg6eADduJ3uj"
 GRAD_METHODS = ("migrate_to_amm", "migrate_to_cpswap")
 
+# Outbound batching: graduations are queued and coalesced into as few
+# channel.send calls as possible (Discord allows ~5 msgs / 5 s per channel).
+SEND_QUEUE_MAX = 1000
+SEND_BATCH_MAX_ITEMS = 10
+SEND_BATCH_MAX_CHARS = 1800
+SEND_FLUSH_SECS = 0.75
+
 SUBSCRIPTION = """
 subscription LaunchLabGraduations($program: String!, $successOnly: Boolean!) {
   Solana {
@@ -73,9 +82,16 @@ def _first_mint(accounts: List[dict]) -> Optional[str]:
             return t["Mint"]
     return None
 
+@functools.lru_cache(maxsize=4096)
 def _fmt_pt(ts_iso: str) -> str:
-    # Example ts_iso: "2025-08-26T18:01:23Z"
-    dt_utc = datetime.fromisoformat(ts_iso.replace("Z", "+00:00"))
+    # Example ts_iso: "2025-08-26T18:01:23Z" — fixed width, so slice instead of parsing.
+    # Cached: rows in one push usually share a block time.
+    s = ts_iso
+    if len(s) >= 20 and s[-1] == "Z":
+        dt_utc = datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                          int(s[11:13]), int(s[14:16]), int(s[17:19]), tzinfo=timezone.utc)
+    else:  # explicit offset or other shape; let fromisoformat handle it
+        dt_utc = datetime.fromisoformat(s)
     dt_pt = dt_utc.astimezone(PT)
     return dt_pt.strftime("%b %d, %Y • %I:%M:%S %p %Z")  # with am/pm
 
@@ -83,7 +99,11 @@ class GraduationWatcher(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._task = None
+        self._sender = None
+        self._backoff = 1  # reconnect ceiling (s); reset once the stream delivers events
         self._stop = asyncio.Event()
+        self._outq: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_MAX)
+        self._channel = None
 
         self.bitquery_token = os.getenv("BITQUERY_TOKEN", "").strip()
         if not self.bitquery_token:
@@ -103,27 +123,73 @@ class GraduationWatcher(commands.Cog):
         if not self._task and self.bitquery_token and self.channel_id:
             self._task = asyncio.create_task(self._run_loop(), name="graduation-watcher")
             log.info("GraduationWatcher task started.")
+        if not self._sender and self._task:
+            self._sender = asyncio.create_task(self._drain(), name="graduation-sender")
 
     def cog_unload(self):
         if self._task:
             self._stop.set()
             self._task.cancel()
+        if self._sender:
+            self._sender.cancel()
+
+    # ------------- outbound -------------
+
+    def _enqueue(self, text: str):
+        # Never block the websocket consumer on Discord; drop the oldest post when full
+        if self._outq.full():
+            try:
+                self._outq.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            log.warning("Graduation send queue full — dropped oldest message.")
+        self._outq.put_nowait(text)
+
+    async def _drain(self):
+        # Wait for one post, then keep collecting until the batch is full or
+        # SEND_FLUSH_SECS pass without a new one; send the batch as one message.
+        carry = None
+        while True:
+            first = carry if carry is not None else await self._outq.get()
+            carry = None
+            buf = [first]
+            size = len(first)
+            while len(buf) < SEND_BATCH_MAX_ITEMS:
+                try:
+                    text = await asyncio.wait_for(self._outq.get(), timeout=SEND_FLUSH_SECS)
+                except asyncio.TimeoutError:
+                    break
+                if size + 2 + len(text) > SEND_BATCH_MAX_CHARS:
+                    carry = text  # starts the next batch
+                    break
+                buf.append(text)
+                size += 2 + len(text)
+            await self._send("\n\n".join(buf))
+
+    async def _send(self, content: str):
+        channel = self._channel
+        try:
+            if hasattr(channel, "send"):
+                await channel.send(content)
+            else:
+                log.warning("Cannot send to channel type: %s", type(channel))
+        except Exception as e:
+            log.exception("Failed to send Discord message: %s", e)
 
     # ------------- core loop -------------
 
     async def _run_loop(self):
-        # Exponential backoff reconnect loop
-        backoff = 1
+        # Exponential backoff reconnect loop with full jitter, so several bot
+        # processes don't reconnect to Bitquery in lock-step
         while not self._stop.is_set():
             try:
                 await self._subscribe_and_forward()
-                backoff = 1  # reset on clean exit
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.exception("Graduation watcher error: %s", e)
-                await asyncio.sleep(min(backoff, 30))
-                backoff = min(backoff * 2, 60)
+                await asyncio.sleep(random.uniform(0, min(self._backoff, 30)))
+                self._backoff = min(self._backoff * 2, 60)
 
     async def _subscribe_and_forward(self):
         # Connect WebSocket to Bitquery streaming GraphQL
@@ -139,6 +205,7 @@ class GraduationWatcher(commands.Cog):
 
         if not isinstance(channel, (discord.TextChannel, discord.Thread, discord.VoiceChannel, discord.StageChannel)):
             log.warning("Channel %s not a text-capable channel.", self.channel_id)
+        self._channel = channel
 
         async with Client(transport=transport, fetch_schema_from_transport=False) as session:
             query = gql(SUBSCRIPTION)
@@ -146,45 +213,39 @@ class GraduationWatcher(commands.Cog):
             log.info("Subscribing to LaunchLab graduations for program %s", self.program_id)
 
             async for ev in session.subscribe(query, variable_values=variables):
+                self._backoff = 1  # the stream is delivering; a later drop starts from a short delay
                 rows = ev.get("Solana", {}).get("Instructions", [])
                 if not rows:
                     continue
-                row = rows[0]
-
-                block_time = row["Block"]["Time"]  # ISO
-                signature = row["Transaction"]["Signature"]
-                method = row["Instruction"]["Program"]["Method"]
-                accounts = row["Instruction"]["Accounts"]
-                mint = _first_mint(accounts) or "unknown"
-
-                # Build links
-                sig_url = f"https://solscan.io/tx/{signature}"
-                mint_url = f"https://solscan.io/token/{mint}" if mint != "unknown" else None
-
-                ts = _fmt_pt(block_time)
-
-                # Format Discord message
-                title_emoji = "🎓"
-                raydium_kind = "AMM v4" if method == "migrate_to_amm" else "CPMM"
-                header = f"{title_emoji} **Graduated to Raydium ({raydium_kind})**"
-
-                lines = [
-                    header,
-                    f"• **Time (PT):** {ts}",
-                    f"• **Method:** `{method}`",
-                    f"• **Mint:** {f'`{mint}`' if not mint_url else f'[`{mint}`]({mint_url})'}",
-                    f"• **Tx:** [{signature}]({sig_url})",
-                    "",
-                    "Next checks: watch first pool/trade on Raydium to confirm liquidity."
-                ]
-
-                try:
-                    if hasattr(channel, "send"):
-                        await channel.send("\n".join(lines))
-                    else:
-                        log.warning("Cannot send to channel type: %s", type(channel))
-                except Exception as e:
-                    log.exception("Failed to send Discord message: %s", e)
+                for row in rows:
+                    block_time = row["Block"]["Time"]  # ISO
+                    signature = row["Transaction"]["Signature"]
+                    method = row["Instruction"]["Program"]["Method"]
+                    accounts = row["Instruction"]["Accounts"]
+                    mint = _first_mint(accounts) or "unknown"
+
+                    # Build links
+                    sig_url = f"https://solscan.io/tx/{signature}"
+                    mint_url = f"https://solscan.io/token/{mint}" if mint != "unknown" else None
+
+                    ts = _fmt_pt(block_time)
+
+                    # Format Discord message
+                    title_emoji = "🎓"
+                    raydium_kind = "AMM v4" if method == "migrate_to_amm" else "CPMM"
+                    header = f"{title_emoji} **Graduated to Raydium ({raydium_kind})**"
+
+                    lines = [
+                        header,
+                        f"• **Time (PT):** {ts}",
+                        f"• **Method:** `{method}`",
+                        f"• **Mint:** {f'`{mint}`' if not mint_url else f'[`{mint}`]({mint_url})'}",
+                        f"• **Tx:** [{signature}]({sig_url})",
+                        "",
+                        "Next checks: watch first pool/trade on Raydium to confirm liquidity."
+                    ]
+
+                    self._enqueue("\n".join(lines))
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(GraduationWatcher(bot))
@@ -1,22 +1,30 @@
-import re, math, time
-from typing import Optional, List, Dict
+import re, math, time, asyncio
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
 from .constants import LAMPORTS
 from .config import SOLANA_USE_FDV
 import discord
 
+_B58_RE = re.compile(r"[1-9A-HJ-NP-Za-km-z]+")
+
+@lru_cache(maxsize=4096)
 def is_solana_address(addr: str) -> bool:
-    if not addr or addr.startswith("0x"): return False
-    return 32 <= len(addr) <= 44 and re.fullmatch(r"[1-9A-HJ-NP-Za-km-z]+", addr) is not None
+    # Length first (also rejects ""); "0x…" EVM addresses fail the alphabet, which has no '0'.
+    if not addr or not 32 <= len(addr) <= 44: return False
+    return _B58_RE.fullmatch(addr) is not None
 
 def short_ca(ca: str) -> str: return f"{ca[:4]}…{ca[-4:]}"
 def to_lamports(sol: float) -> int: return int(round(sol * LAMPORTS))
 
+_MONEY_UNITS = ("","K","M","B","T","P")
+
 def money(x: float) -> str:
-    n=float(x)
-    for u in ["","K","M","B","T"]:
-        if abs(n) < 1000: return f"{n:,.2f}{u}"
-        n/=1000
-    return f"{n:,.2f}P"
+    n=float(x); a=abs(n)
+    if a < 1000: return f"{n:,.2f}"
+    k = min(5, int(math.log10(a))//3) if a < math.inf else 5  # NaN/inf land on "P", as before
+    if a < 1000.0**k: k -= 1  # log10 rounds up to the boundary just below a power of 1000
+    return f"{n/1000**k:,.2f}{_MONEY_UNITS[k]}"
 
 def humanize(x: Optional[float]) -> str:
     if x is None: return "—"
@@ -39,17 +47,55 @@ def _percentile(sorted_vals: List[float], p: float) -> float:
     if f==c: return sorted_vals[int(k)]
     return sorted_vals[f] + (sorted_vals[c]-sorted_vals[f])*(k-f)
 
-def _median(vals: List[float]) -> float:
-    s=sorted(vals); n=len(s)
+def _median(sorted_vals: List[float]) -> float:
+    s=sorted_vals; n=len(s)
     if n==0: return 0.0
     return s[n//2] if n%2 else 0.5*(s[n//2-1] + s[n//2])
 
+_UNAME_TTL = 600.0
+_UNAME_MISS_TTL = 60.0  # unknown/deleted users: don't re-fetch on every table render
+_UNAME_MAX = 4096  # LRU bound for both maps; TTLs alone never evict
+_UNAME_CACHE: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+_UNAME_MISSES: "OrderedDict[int, float]" = OrderedDict()
+
 async def username_from_id(client: discord.Client, user_id: int) -> str:
+    now = time.monotonic()
+    hit = _UNAME_CACHE.get(user_id)
+    if hit and now - hit[0] < _UNAME_TTL:
+        _UNAME_CACHE.move_to_end(user_id)
+        return hit[1]
     user = client.get_user(user_id)
     if user is None:
+        miss = _UNAME_MISSES.get(user_id)
+        if miss is not None and now - miss < _UNAME_MISS_TTL: return f"user:{user_id}"
         try: user = await client.fetch_user(user_id)
         except Exception: user = None
-    return user.name if user else f"user:{user_id}"
+    if user is None:
+        _UNAME_MISSES[user_id] = now; _UNAME_MISSES.move_to_end(user_id)
+        if len(_UNAME_MISSES) > _UNAME_MAX: _UNAME_MISSES.popitem(last=False)
+        return f"user:{user_id}"
+    _UNAME_MISSES.pop(user_id, None)
+    _UNAME_CACHE[user_id] = (now, user.name); _UNAME_CACHE.move_to_end(user_id)
+    if len(_UNAME_CACHE) > _UNAME_MAX: _UNAME_CACHE.popitem(last=False)
+    return user.name
+
+_CHANNEL_TTL = 300.0
+_CHANNEL_CACHE: Dict[int, Tuple[float, discord.abc.Messageable]] = {}
+
+async def resolve_channel(client: discord.Client, channel_id: int):
+    ch = client.get_channel(channel_id)
+    if ch is not None: return ch
+    now = time.monotonic()
+    hit = _CHANNEL_CACHE.get(channel_id)
+    if hit and now - hit[0] < _CHANNEL_TTL: return hit[1]
+    ch = await client.fetch_channel(channel_id)
+    _CHANNEL_CACHE[channel_id] = (now, ch)
+    return ch
+
+async def usernames_from_ids(client: discord.Client, user_ids) -> Dict[int, str]:
+    uids = list(user_ids)
+    names = await asyncio.gather(*(username_from_id(client, uid) for uid in uids))
+    return dict(zip(uids, names))
 
 def when_str(ts: float) -> str:
     return time.strftime("%m-%d %H:%M", time.localtime(ts))
@@ -1,4 +1,5 @@
-import logging
+import atexit, logging, queue
+from logging.handlers import QueueHandler, QueueListener
 from .config import LOG_LEVEL
 
 class Color:
@@ -18,7 +19,13 @@ def setup_logging():
     root.setLevel(LOG_LEVEL)
     h = logging.StreamHandler()
     h.setFormatter(ColorFormatter("%(message)s"))
-    root.handlers[:] = [h]
+    # Callers only enqueue records; stderr writes happen on the listener's thread,
+    # so hot paths (stream workers, alert loop) never block the event loop on I/O.
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.handlers[:] = [QueueHandler(q)]
+    listener = QueueListener(q, h, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     logging.getLogger("aiohttp").setLevel(logging.WARNING)
     logging.getLogger("discord").setLevel(logging.WARNING)
     logging.getLogger("discord.client").setLevel(logging.INFO)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import Optional
+from .helpers import humanize
 
 @dataclass
 class Reminder:
@@ -13,6 +14,11 @@ class Reminder:
     symbol: str
     note: str = ""
 
+    def __post_init__(self):
+        # Static /mc_list columns; plain attributes so they stay out of asdict/JSON.
+        self._fmt_label = self.symbol or self.name
+        self._fmt_target = f"{'≥' if self.direction == 'above' else '≤'} ${humanize(self.target_mc)}"
+
 @dataclass
 class TokenSnapshot:
     mc: Optional[float]
@@ -1,11 +1,14 @@
 import asyncio
+import secrets
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 import discord
-from .storage import invoices, save_invoices
+from .storage import pending_invoices, expired_invoices, settle_invoice, save_invoices, save_pay_cursor, load_pay_cursor
 from .config import PAY_EXPIRY_SEC, PAY_POLL_SEC, USDC_MINT, DONATION_WALLET
-from .solana import sol_rpc, _random_pubkey
-from .helpers import to_lamports, is_solana_address
+from .solana import sol_rpc
+from .helpers import to_lamports, is_solana_address, resolve_channel
+from .constants import BASE58_ALPHABET
 from .logging_setup import log
 
 def solana_pay_link(recipient: str, amount: float, *, label: str="McCap", message: str="", reference: str="", spl_token: Optional[str]=None) -> str:
@@ -22,88 +25,150 @@ def qr_url(data: str, size: int = 240) -> str:
     return f"https://api.qrserver.com/v1/create-qr-code/?size={size}x{size}&data={quote(data)}"
 
 def _sum_usdc_delta_for_wallet(meta: dict, msg: dict, mint: str, owner_wallet: str) -> int:
-    keys = [k.get("pubkey") if isinstance(k, dict) else k for k in (msg.get("message") or {}).get("accountKeys", [])]
-    pre = meta.get("preTokenBalances") or []; post= meta.get("postTokenBalances") or []
-    def _tb_map(tbs):
-        out={}; 
+    # accountIndex -> [owner, pre_amt, post_amt, decimals]; post-balance owner/decimals win, as before
+    by_idx={}
+    for col, tbs in ((1, meta.get("preTokenBalances") or ()), (2, meta.get("postTokenBalances") or ())):
         for tb in tbs:
             try:
                 if tb.get("mint") != mint: continue
-                idx=tb.get("accountIndex"); owner=tb.get("owner")
-                dec=int(((tb.get("uiTokenAmount") or {}).get("decimals") or 0))
-                amt=int(((tb.get("uiTokenAmount") or {}).get("amount") or "0"))
-                out[idx]=(owner, amt, dec)
+                ui=tb.get("uiTokenAmount") or {}
+                dec=int(ui.get("decimals") or 0); amt=int(ui.get("amount") or "0")
+                ent=by_idx.get(tb.get("accountIndex"))
+                if ent is None: by_idx[tb.get("accountIndex")]=ent=[None, 0, 0, 0]
+                ent[0]=tb.get("owner"); ent[col]=amt; ent[3]=dec
             except Exception: continue
-        return out
-    pre_map=_tb_map(pre); post_map=_tb_map(post)
     delta_total=0
-    for idx in set(pre_map.keys()) | set(post_map.keys()):
-        pre_t=pre_map.get(idx); post_t=post_map.get(idx)
-        owner=(post_t[0] if post_t else (pre_t[0] if pre_t else None))
-        if owner != owner_wallet: continue
-        pre_amt=pre_t[1] if pre_t else 0; post_amt=post_t[1] if post_t else 0
-        dec=(post_t[2] if post_t else (pre_t[2] if pre_t else 0))
-        if dec != 6: continue
+    for owner, pre_amt, post_amt, dec in by_idx.values():
+        if owner != owner_wallet or dec != 6: continue
         delta=post_amt-pre_amt
         if delta>0: delta_total+=delta
     return delta_total
 
-async def _find_matching_tx(reference: str, inv) -> Optional[str]:
-    if not is_solana_address(DONATION_WALLET):
-        log.warning("DONATION_WALLET not set or invalid; cannot verify payments.")
-        return None
-    sigs = await sol_rpc("getSignaturesForAddress", [DONATION_WALLET, {"limit": 50}])
-    if not sigs or "result" not in sigs: return None
-    for ent in sigs["result"]:
-        sig = ent.get("signature")
+# Parsed getTransaction results by signature: sig -> (account keys, meta, tx). Landed
+# transactions don't change, so later ticks reuse them instead of refetching.
+_TX_CACHE_MAX = 512
+_tx_cache: "OrderedDict[str, Tuple[list, dict, dict]]" = OrderedDict()
+_TX_FETCH_CONCURRENCY = 8
+
+# Newest signature already processed for DONATION_WALLET; passed as `until` so each
+# tick only lists signatures that landed since. Persisted next to PAY_FILE.
+_last_sig: Optional[str] = None
+_SIG_PAGE = 50
+_SIG_MAX_PAGES = 10  # cap per tick; a longer backlog is finished on later ticks
+# A scan that hit the page cap: (oldest sig listed so far, cursor to save once it reaches
+# _last_sig). The next tick pages on from there instead of restarting at the newest.
+_scan_resume: Optional[Tuple[str, Optional[str]]] = None
+
+async def _fetch_tx(sig: str, sem: asyncio.Semaphore) -> Optional[Tuple[list, dict, dict]]:
+    hit = _tx_cache.get(sig)
+    if hit is not None: return hit
+    async with sem:
         tx = await sol_rpc("getTransaction", [sig, {"encoding":"jsonParsed","maxSupportedTransactionVersion":0}])
-        try:
-            res=(tx or {}).get("result") or {}; msg=res.get("transaction") or {}; meta=res.get("meta") or {}
-            keys=[k.get("pubkey") if isinstance(k, dict) else k for k in (msg.get("message") or {}).get("accountKeys", [])]
-            if reference not in keys: continue
-            if inv.asset=="SOL":
-                pre=meta.get("preBalances") or []; post=meta.get("postBalances") or []
-                idx=None
-                for i,k in enumerate(keys):
-                    if k==DONATION_WALLET: idx=i; break
-                if idx is None: continue
-                pre_bal=pre[idx] if idx<len(pre) else None; post_bal=post[idx] if idx<len(post) else None
-                if pre_bal is None or post_bal is None: continue
-                if post_bal - pre_bal >= inv.amount_base: return sig
-            else:
-                delta=_sum_usdc_delta_for_wallet(meta, msg, inv.mint, DONATION_WALLET)
-                if delta >= inv.amount_base: return sig
-        except Exception:
-            continue
-    return None
+    res = (tx or {}).get("result")
+    if not res: return None  # not available yet; retried next tick
+    msg=res.get("transaction") or {}; meta=res.get("meta") or {}
+    keys=[k.get("pubkey") if isinstance(k, dict) else k for k in (msg.get("message") or {}).get("accountKeys", [])]
+    _tx_cache[sig] = parsed = (keys, meta, msg)
+    if len(_tx_cache) > _TX_CACHE_MAX: _tx_cache.popitem(last=False)
+    return parsed
+
+async def _recent_txs() -> List[Tuple[str, list, dict, dict]]:
+    """Newest-first (sig, keys, meta, tx) for DONATION_WALLET since the cursor: usually one
+    signature lookup per tick, with the transactions fetched concurrently and shared by every
+    pending invoice."""
+    global _last_sig, _scan_resume
+    # A full page may hide older signatures that are still newer than the cursor: page back
+    # with `before` until a short page shows we reached it. Without a cursor, one page.
+    before, cand = _scan_resume or (None, None)
+    order: List[str] = []; reached = False
+    for _ in range(_SIG_MAX_PAGES):
+        opts = {"limit": _SIG_PAGE}
+        if _last_sig: opts["until"] = _last_sig
+        if before: opts["before"] = before
+        sigs = await sol_rpc("getSignaturesForAddress", [DONATION_WALLET, opts])
+        if not sigs or "result" not in sigs: break
+        page = sigs["result"]
+        if page and not page[-1].get("signature"): break  # can't page on from it; retry next tick
+        order += [ent.get("signature") for ent in page if ent.get("signature")]
+        if len(page) < _SIG_PAGE or not _last_sig:
+            reached = True; break
+        before = page[-1]["signature"]
+    if not order and not reached: return []
+    sem = asyncio.Semaphore(_TX_FETCH_CONCURRENCY)
+    txs = await asyncio.gather(*(_fetch_tx(sig, sem) for sig in order))
+    # The cursor may only pass signatures whose transaction we actually have: it ends up just
+    # older than the oldest unavailable one (None = the next signature listed), carried across ticks.
+    for sig, t in zip(order, txs):
+        if t is None: cand = None
+        elif cand is None: cand = sig
+    if reached:
+        _scan_resume = None
+        cursor = cand or _last_sig
+        if cursor and cursor != _last_sig:
+            _last_sig = cursor
+            await save_pay_cursor(DONATION_WALLET, cursor)
+    elif order:
+        _scan_resume = (order[-1], cand)
+        log.warning("Payment signature backlog: %s listed this tick without reaching the cursor; continuing before %s next tick",
+                    len(order), order[-1])
+    return [(sig, *t) for sig, t in zip(order, txs) if t is not None]
+
+def _tx_pays(inv, keys: list, meta: dict, msg: dict) -> bool:
+    if inv.asset=="SOL":
+        pre=meta.get("preBalances") or []; post=meta.get("postBalances") or []
+        try: idx=keys.index(DONATION_WALLET)
+        except ValueError: return False
+        pre_bal=pre[idx] if idx<len(pre) else None; post_bal=post[idx] if idx<len(post) else None
+        if pre_bal is None or post_bal is None: return False
+        return post_bal - pre_bal >= inv.amount_base
+    return _sum_usdc_delta_for_wallet(meta, msg, inv.mint, DONATION_WALLET) >= inv.amount_base
+
+def _match_pending(pending: list, txs: List[Tuple[str, list, dict, dict]]) -> List[Tuple[object, str]]:
+    """(invoice, sig) pairs: each invoice gets the newest tx that references it and pays enough.
+    One set intersection per tx instead of scanning every tx's keys for every invoice."""
+    by_ref = {inv.reference: inv for inv in pending}
+    out = []
+    for sig, keys, meta, msg in txs:
+        if not by_ref: break
+        for ref in by_ref.keys() & set(keys):
+            inv = by_ref[ref]
+            try:
+                if not _tx_pays(inv, keys, meta, msg): continue
+            except Exception:
+                continue
+            out.append((inv, sig)); del by_ref[ref]
+    return out
 
 async def payments_watcher(client: discord.Client):
+    global _last_sig
     await client.wait_until_ready()
+    _last_sig = load_pay_cursor(DONATION_WALLET)
     while not client.is_closed():
         now = time.time(); changed=False
-        for inv in list(invoices):
-            if inv.status != "pending": continue
-            if now - inv.created_ts > PAY_EXPIRY_SEC:
-                inv.status="expired"; changed=True
-                try:
-                    ch=await client.fetch_channel(inv.channel_id)
-                    await ch.send(f"⌛ Payment `{inv.id}` expired.")
-                    log.info(f"Payment expired | id={inv.id} user={inv.user_id} asset={inv.asset}")
-                except Exception:
-                    import logging; logging.exception("Failed to send payment expiry message")
-                continue
-            sig = await _find_matching_tx(inv.reference, inv)
-            if sig:
-                inv.status="paid"; inv.tx_sig=sig; changed=True
-                try:
-                    ch=await client.fetch_channel(inv.channel_id)
-                    amt_str=f"{inv.amount_base / (10**inv.decimals):,.4f} {inv.asset}"
-                    embed=discord.Embed(title="✅ Payment received", description=f"{amt_str} to bot wallet\n`{sig}`", color=0x2ecc71)
-                    await ch.send(content=f"<@{inv.user_id}>", embed=embed,
-                                  allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False, replied_user=False))
-                    log.info(f"Payment confirmed | id={inv.id} user={inv.user_id} asset={inv.asset} sig={sig}")
-                except Exception:
-                    import logging; logging.exception("Failed to send payment confirmation")
+        for inv in expired_invoices(now, PAY_EXPIRY_SEC):
+            settle_invoice(inv, "expired"); changed=True
+            try:
+                ch=await resolve_channel(client, inv.channel_id)
+                await ch.send(f"⌛ Payment `{inv.id}` expired.")
+                log.info(f"Payment expired | id={inv.id} user={inv.user_id} asset={inv.asset}")
+            except Exception:
+                import logging; logging.exception("Failed to send payment expiry message")
+        pending = list(pending_invoices)
+        if pending and not is_solana_address(DONATION_WALLET):
+            log.warning("DONATION_WALLET not set or invalid; cannot verify payments.")
+            pending=[]
+        txs = await _recent_txs() if pending else []
+        for inv, sig in _match_pending(pending, txs):
+            settle_invoice(inv, "paid", sig); changed=True
+            try:
+                ch=await resolve_channel(client, inv.channel_id)
+                amt_str=f"{inv.amount_base / (10**inv.decimals):,.4f} {inv.asset}"
+                embed=discord.Embed(title="✅ Payment received", description=f"{amt_str} to bot wallet\n`{sig}`", color=0x2ecc71)
+                await ch.send(content=f"<@{inv.user_id}>", embed=embed,
+                              allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False, replied_user=False))
+                log.info(f"Payment confirmed | id={inv.id} user={inv.user_id} asset={inv.asset} sig={sig}")
+            except Exception:
+                import logging; logging.exception("Failed to send payment confirmation")
         if changed: await save_invoices()
         await asyncio.sleep(PAY_POLL_SEC)
 
@@ -114,4 +179,5 @@ def parse_asset_choice(s: Optional[str]) -> tuple[str,int,Optional[str]]:
     return ("SOL", 9, None)
 
 def new_invoice_id() -> str:
-    return _random_pubkey()[:6]
+    # 6 uniform base58 chars; no need to encode a whole 32-byte key and slice it
+    return "".join(secrets.choice(BASE58_ALPHABET) for _ in range(6))
@@ -1,15 +1,35 @@
 import aiohttp
+import orjson
 from typing import Optional
 from .config import SOLANA_RPC, DONATION_WALLET
 from .constants import BASE58_ALPHABET
 from .helpers import is_solana_address
 
+# Shared RPC session (keep-alive + DNS cache); created lazily on the running loop.
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _session
+
+async def close_session() -> None:
+    global _session
+    if _session is not None and not _session.closed: await _session.close()
+    _session = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 async def sol_rpc(method: str, params: list):
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as s:
-            async with s.post(SOLANA_RPC, json={"jsonrpc":"2.0","id":1,"method":method,"params":params}) as r:
-                if r.status != 200: return None
-                return await r.json()
+        body = orjson.dumps({"jsonrpc":"2.0","id":1,"method":method,"params":params})
+        async with get_session().post(SOLANA_RPC, data=body, headers=_JSON_HEADERS) as r:
+            if r.status != 200: return None
+            return orjson.loads(await r.read())  # getTransaction bodies can be 100+ KB
     except Exception:
         return None
 
@@ -28,9 +48,10 @@ def _random_pubkey() -> str:
     import secrets
     raw = secrets.token_bytes(32)
     n = int.from_bytes(raw, "big")
-    out = ""
+    digits = []  # least-significant first; appended, then reversed once
     while n > 0:
         n, rem = divmod(n, 58)
-        out = BASE58_ALPHABET[rem] + out
+        digits.append(BASE58_ALPHABET[rem])
+    out = "".join(reversed(digits))
     lead_zeros = len(raw) - len(raw.lstrip(b"\x00"))
     return "1"*lead_zeros + (out or "1")
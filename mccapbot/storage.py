@@ -1,32 +1,128 @@
-import json, asyncio, time
-from dataclasses import asdict
-from typing import List
-from .config import REM_FILE, PAY_FILE, ALERTS_FILE
+import asyncio, os, time
+from bisect import bisect_left, bisect_right, insort
+import orjson
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Set
+from .config import REM_FILE, PAY_FILE, PAY_CURSOR_FILE, ALERTS_FILE, LOG_LEVEL
 from .logging_setup import log
 from .models import Reminder, Invoice, AlertEvent
 
 # In-memory
 reminders: List[Reminder] = []
 invoices:  List[Invoice]  = []
-alert_events: List[AlertEvent] = []
+alert_events: Deque[AlertEvent] = deque(maxlen=1000)
+
+# Reminder indexes (kept in sync via add_reminder/remove_reminder)
+# Per-CA above/below buckets are sorted by target_mc for bisect lookups.
+reminders_above:    Dict[str, List[Reminder]] = {}
+reminders_below:    Dict[str, List[Reminder]] = {}
+reminders_by_guild: Dict[int, List[Reminder]] = {}
+_ca_refs: Counter = Counter()  # reminders per CA; keys are the CAs being watched
+
+# Pending invoices in created_ts order (kept in sync via add_invoice/settle_invoice);
+# the payments watcher scans only these, and the expired ones form a prefix.
+pending_invoices: List[Invoice] = []
 
 # Locks
 REM_LOCK    = asyncio.Lock()
 PAY_LOCK    = asyncio.Lock()
 ALERTS_LOCK = asyncio.Lock()
 
+# Set while at least one reminder exists; the watcher parks on it when idle.
+reminders_nonempty = asyncio.Event()
+
+# Files whose in-memory rows changed since the last successful save; savers skip clean ones.
+_dirty: Set[str] = set()
+
+def mark_alerts_dirty() -> None: _dirty.add(ALERTS_FILE)
+
+# Files are machine-read; indent only when debugging (compact is ~2-3x smaller to encode and write).
+_JSON_OPTS = orjson.OPT_INDENT_2 if LOG_LEVEL == "DEBUG" else 0
+
+def _write_json(path: str, rows: list | dict) -> None:
+    # Write a sibling temp file and rename over the target: a crash mid-write
+    # leaves the previous file intact instead of a truncated one.
+    data = orjson.dumps(rows, option=_JSON_OPTS)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _read_json(path: str):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+async def _save_if_dirty(lock: asyncio.Lock, path: str, rows) -> None:
+    async with lock:
+        if path not in _dirty: return
+        _dirty.discard(path)  # cleared at snapshot time; a mutation during the write re-marks it
+        try:
+            await asyncio.to_thread(_write_json, path, list(rows))
+        except BaseException:
+            _dirty.add(path); raise
+
 # ---- Reminders ----
+def _discard(items: list, obj) -> bool:
+    for i, x in enumerate(items):
+        if x is obj:
+            del items[i]; return True
+    return False
+
+def _target(r: Reminder) -> float:
+    return r.target_mc
+
+def _by_direction(r: Reminder) -> Dict[str, List[Reminder]]:
+    return reminders_above if r.direction == "above" else reminders_below
+
+def _index_reminder(r: Reminder) -> None:
+    insort(_by_direction(r).setdefault(r.ca, []), r, key=_target)
+    _ca_refs[r.ca] += 1
+    reminders_by_guild.setdefault(r.guild_id, []).append(r)
+
+def add_reminder(r: Reminder) -> None:
+    reminders.append(r); _index_reminder(r); _dirty.add(REM_FILE)
+    reminders_nonempty.set()
+
+def remove_reminder(r: Reminder) -> None:
+    if not _discard(reminders, r): return
+    _dirty.add(REM_FILE)
+    if not reminders: reminders_nonempty.clear()
+    _ca_refs[r.ca] -= 1
+    if _ca_refs[r.ca] <= 0: del _ca_refs[r.ca]
+    for index, key in ((_by_direction(r), r.ca), (reminders_by_guild, r.guild_id)):
+        bucket = index.get(key)
+        if bucket is None: continue
+        _discard(bucket, r)
+        if not bucket: del index[key]
+
+def has_target_near(ca: str, mc: float, band: float) -> bool:
+    """True if some reminder on `ca` has |mc - target| <= band * target, i.e. a target
+    in [mc/(1+band), mc/(1-band)]; one bisect per direction bucket."""
+    lo = mc / (1 + band); hi = mc / (1 - band) if band < 1 else float("inf")
+    for bucket in (reminders_above.get(ca, ()), reminders_below.get(ca, ())):
+        i = bisect_left(bucket, lo, key=_target)
+        if i < len(bucket) and bucket[i].target_mc <= hi: return True
+    return False
+
+def reminder_cas() -> List[str]:
+    return list(_ca_refs)
+
+def due_reminders(ca: str, current: float) -> List[Reminder]:
+    """Reminders on `ca` whose target has been crossed at `current` MC."""
+    above = reminders_above.get(ca, ()); below = reminders_below.get(ca, ())
+    return list(above[:bisect_right(above, current, key=_target)]) + list(below[bisect_left(below, current, key=_target):])
+
 async def save_reminders():
-    async with REM_LOCK:
-        with open(REM_FILE, "w", encoding="utf-8") as f:
-            json.dump([asdict(r) for r in reminders], f, ensure_ascii=False, indent=2)
+    await _save_if_dirty(REM_LOCK, REM_FILE, reminders)
 
 async def load_reminders():
     try:
-        with open(REM_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        reminders.clear()
-        for it in data: reminders.append(Reminder(**it))
+        data = _read_json(REM_FILE)
+        reminders.clear(); reminders_above.clear(); reminders_below.clear(); reminders_by_guild.clear(); _ca_refs.clear()
+        reminders_nonempty.clear()
+        for it in data: add_reminder(Reminder(**it))
+        _dirty.discard(REM_FILE)  # matches disk
         log.info(f"Loaded {len(reminders)} reminder(s)")
     except FileNotFoundError:
         log.info("No reminders file found; starting fresh.")
@@ -34,38 +130,62 @@ async def load_reminders():
         log.exception("Failed to load reminders.json")
 
 # ---- Invoices ----
+def _created(inv: Invoice) -> float:
+    return inv.created_ts
+
+def add_invoice(inv: Invoice) -> None:
+    invoices.append(inv); _dirty.add(PAY_FILE)
+    if inv.status == "pending": insort(pending_invoices, inv, key=_created)
+
+def settle_invoice(inv: Invoice, status: str, tx_sig: Optional[str] = None) -> None:
+    """Move a pending invoice to `status` ("paid"/"expired")."""
+    inv.status = status
+    if tx_sig: inv.tx_sig = tx_sig
+    _discard(pending_invoices, inv); _dirty.add(PAY_FILE)
+
+def expired_invoices(now: float, expiry_sec: float) -> List[Invoice]:
+    """Pending invoices created more than `expiry_sec` before `now`."""
+    return pending_invoices[:bisect_left(pending_invoices, now - expiry_sec, key=_created)]
+
 async def save_invoices():
-    async with PAY_LOCK:
-        with open(PAY_FILE, "w", encoding="utf-8") as f:
-            json.dump([asdict(i) for i in invoices], f, ensure_ascii=False, indent=2)
+    await _save_if_dirty(PAY_LOCK, PAY_FILE, invoices)
 
 async def load_invoices():
     try:
-        with open(PAY_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _read_json(PAY_FILE)
         invoices.clear()
         for it in data: invoices.append(Invoice(**it))
         cutoff = time.time() - 7*24*3600
         invoices[:] = [i for i in invoices if not (i.status in ("paid","expired") and i.created_ts < cutoff)]
+        pending_invoices[:] = sorted((i for i in invoices if i.status == "pending"), key=_created)
         log.info(f"Loaded {len(invoices)} payment record(s)")
     except FileNotFoundError:
         log.info("No payments file found; starting fresh.")
     except Exception:
         log.exception("Failed to load payments.json")
 
+async def save_pay_cursor(wallet: str, last_sig: str):
+    async with PAY_LOCK:
+        await asyncio.to_thread(_write_json, PAY_CURSOR_FILE, {wallet: last_sig})
+
+def load_pay_cursor(wallet: str) -> Optional[str]:
+    try:
+        return _read_json(PAY_CURSOR_FILE).get(wallet)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        log.exception("Failed to load payments_cursor.json")
+        return None
+
 # ---- Alerts ----
 async def save_alerts():
-    async with ALERTS_LOCK:
-        with open(ALERTS_FILE, "w", encoding="utf-8") as f:
-            json.dump([asdict(a) for a in alert_events], f, ensure_ascii=False, indent=2)
+    await _save_if_dirty(ALERTS_LOCK, ALERTS_FILE, alert_events)
 
 async def load_alerts():
     try:
-        with open(ALERTS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        alert_events.clear()
-        for it in data: alert_events.append(AlertEvent(**it))
-        alert_events[:] = sorted(alert_events, key=lambda x: x.ts, reverse=True)[:1000]
+        data = _read_json(ALERTS_FILE)
+        events = sorted((AlertEvent(**it) for it in data), key=lambda x: x.ts, reverse=True)
+        alert_events.clear(); alert_events.extend(events[:alert_events.maxlen])
         log.info(f"Loaded {len(alert_events)} alert event(s)")
     except FileNotFoundError:
         log.info("No alerts file found; starting fresh.")